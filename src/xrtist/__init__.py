@@ -2,4 +2,5 @@
 
 __version__ = "0.0.1"
 
+from .figure_pool import FigurePool
 from .plot_collection import PlotCollection, PlotMuseum
@@ -1,7 +1,18 @@
 """Bokeh interface layer."""
 
+from contextlib import contextmanager, nullcontext
+from contextvars import ContextVar
+
 import numpy as np
 from bokeh.layouts import gridplot
+from bokeh.models import (
+    CDSView,
+    ColumnDataSource,
+    CustomJSFilter,
+    Legend,
+    LinearColorMapper,
+    Range1d,
+)
 from bokeh.plotting import figure
 
 
@@ -11,6 +22,21 @@ class UnsetDefault:
 
 unset = UnsetDefault()
 
+_data_dtype = ContextVar("data_dtype", default=None)
+
+# rows of a C-ordered array of `shape` whose positions along each axis are in `indices`,
+# a null entry selects all positions along that axis
+_SOURCE_VIEW_CODE = """
+let rows = [0];
+for (let axis = 0; axis < shape.length; axis++) {
+    const positions = indices[axis] == null
+        ? Array.from({length: shape[axis]}, (_, pos) => pos)
+        : indices[axis];
+    rows = rows.flatMap((row) => positions.map((pos) => row * shape[axis] + pos));
+}
+return rows;
+"""
+
 
 def create_plotting_grid(
     number,
@@ -73,6 +99,153 @@ def create_plotting_grid(
     return layout, figures.squeeze() if squeeze else figures
 
 
+def clear_plotting_grid(number, chart, plots):  # pylint: disable=unused-argument
+    """Remove all glyphs from a chart created by :func:`create_plotting_grid`.
+
+    The layout and figures are kept so they can be reused.
+
+    Parameters
+    ----------
+    number : int
+        Number of figures in use
+    chart : `~bokeh.layouts.gridplot` or None
+    plots : `~bokeh.plotting.figure` or ndarray of `~bokeh.plotting.figure`
+    """
+    for p in np.ravel(plots):  # pylint: disable=invalid-name
+        if p is None:
+            continue
+        p.renderers = []
+        p.center = [obj for obj in p.center if not isinstance(obj, Legend)]
+        if p.title is not None:
+            p.title.text = ""
+
+
+def close_chart(chart):  # pylint: disable=unused-argument
+    """Release the resources associated to `chart`.
+
+    Bokeh documents hold no global state, so this is a no-op kept for interface parity.
+    """
+
+
+def disable_autoscale(target, axis="both"):  # pylint: disable=unused-argument
+    """Stop updating the limits of `target` when glyphs are added to it.
+
+    Bokeh computes data ranges in the browser, so this is a no-op. Data ranges
+    scan all the glyphs even when given an explicit start and end, use
+    :func:`set_limits` to replace them with fixed ranges instead.
+    """
+
+
+def set_limits(targets, x=None, y=None):
+    """Set the same limits on all `targets`.
+
+    The data ranges of `targets` are replaced by a single `~bokeh.models.Range1d`
+    per axis, so the browser doesn't compute bounds from the glyphs and
+    all `targets` stay linked.
+
+    Parameters
+    ----------
+    targets : sequence of `~bokeh.plotting.figure`
+    x, y : tuple of (float, float), optional
+    """
+    x_range = None if x is None else Range1d(float(x[0]), float(x[1]))
+    y_range = None if y is None else Range1d(float(y[0]), float(y[1]))
+    for target in targets:
+        if x_range is not None:
+            target.x_range = x_range
+        if y_range is not None:
+            target.y_range = y_range
+
+
+def rasterization_policy(threshold):  # pylint: disable=unused-argument
+    """Rasterize large artists created within this context.
+
+    Bokeh always renders glyphs on a canvas, so this is a no-op kept for interface parity.
+    """
+    return nullcontext()
+
+
+def create_source(columns):
+    """Create a data source to be shared between glyphs in multiple figures.
+
+    Parameters
+    ----------
+    columns : dict of {str : array_like}
+
+    Returns
+    -------
+    `~bokeh.models.ColumnDataSource`
+    """
+    return ColumnDataSource({key: _cast(value) for key, value in columns.items()})
+
+
+def add_source_columns(source, columns):
+    """Add `columns` to a data source created with :func:`create_source`.
+
+    Parameters
+    ----------
+    source : `~bokeh.models.ColumnDataSource`
+    columns : dict of {str : array_like}
+    """
+    source.data.update({key: _cast(value) for key, value in columns.items()})
+
+
+def source_view(shape, indices):
+    """Create a view selecting a subset of a shared data source.
+
+    The rows of the source are taken as the flattened values of an array of `shape`
+    in C order. The rows are computed in the browser, so the view stores
+    only `shape` and `indices` instead of the position of every row.
+    Views can't be used with glyphs with connected topology such as lines.
+
+    Parameters
+    ----------
+    shape : sequence of int
+    indices : sequence of (sequence of int or None)
+        Positions to select along each axis, None selects all of them.
+
+    Returns
+    -------
+    `~bokeh.models.CDSView`
+    """
+    indices = [None if idx is None else [int(i) for i in idx] for idx in indices]
+    return CDSView(
+        filter=CustomJSFilter(
+            args={"shape": [int(size) for size in shape], "indices": indices},
+            code=_SOURCE_VIEW_CODE,
+        )
+    )
+
+
+@contextmanager
+def data_precision(dtype):
+    """Cast the floating point data of artists created within this context to `dtype`.
+
+    Use ``"float32"`` to halve the size of the data sent to the plotting library.
+    The policy is local to the current thread.
+
+    Parameters
+    ----------
+    dtype : dtype-like or None
+        None keeps the data as is.
+    """
+    token = _data_dtype.set(dtype)
+    try:
+        yield
+    finally:
+        _data_dtype.reset(token)
+
+
+def _cast(values):
+    dtype = _data_dtype.get()
+    if dtype is None:
+        return values
+    ary = np.asarray(values)
+    if ary.ndim == 0 or not np.issubdtype(ary.dtype, np.floating):
+        return values
+    return ary.astype(dtype, copy=False)
+
+
 def _filter_kwargs(kwargs, artist_kws):
     kwargs = {key: value for key, value in kwargs.items() if value is not unset}
     return {**artist_kws, **kwargs}
@@ -80,7 +253,7 @@ def _filter_kwargs(kwargs, artist_kws):
 
 def line(x, y, target, *, color=unset, alpha=unset, linewidth=unset, linestyle=unset, **artist_kws):
     kwargs = dict(color=color, alpha=alpha, line_width=linewidth, line_dash=linestyle)
-    return target.line(x, y, **_filter_kwargs(kwargs, artist_kws))
+    return target.line(_cast(x), _cast(y), **_filter_kwargs(kwargs, artist_kws))
 
 
 def scatter(
@@ -105,9 +278,39 @@ def scatter(
         line_color=edgecolor,
         line_width=edgewidth,
     )
-    return target.scatter(x, y, **_filter_kwargs(kwargs, artist_kws))
+    return target.scatter(_cast(x), _cast(y), **_filter_kwargs(kwargs, artist_kws))
 
 
 def text(x, y, string, target, *, size=unset, alpha=unset, color=unset, **artist_kws):
     kwargs = dict(text_font_size=size, alpha=alpha, color=color)
     return target.text(x, y, string, **_filter_kwargs(kwargs, artist_kws))
+
+
+def image(data, extent, target, *, cmap=unset, alpha=unset, **artist_kws):
+    """Draw `data` as an image covering `extent` with its first row at the bottom.
+
+    Parameters
+    ----------
+    data : array_like of shape (n_rows, n_cols)
+        NaN values are drawn transparent.
+    extent : sequence of float
+        ``(x_min, x_max, y_min, y_max)`` covered by the image.
+    target : `~bokeh.plotting.figure`
+    cmap : str or sequence of colors, default "Viridis256"
+        Palette used to map values to colors.
+    alpha : float, optional
+    """
+    x_min, x_max, y_min, y_max = extent
+    if "color_mapper" not in artist_kws:
+        artist_kws["color_mapper"] = LinearColorMapper(
+            palette="Viridis256" if cmap is unset else cmap, nan_color=(0, 0, 0, 0)
+        )
+    kwargs = dict(global_alpha=alpha)
+    return target.image(
+        image=[np.asarray(_cast(data))],
+        x=x_min,
+        y=y_min,
+        dw=x_max - x_min,
+        dh=y_max - y_min,
+        **_filter_kwargs(kwargs, artist_kws),
+    )
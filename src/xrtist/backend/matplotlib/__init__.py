@@ -1,14 +1,30 @@
 """Matplotlib interface layer."""
 
+from contextlib import contextmanager
+from contextvars import ContextVar
 from typing import Any, Dict
 
+import numpy as np
+from matplotlib.backends.backend_agg import FigureCanvasAgg
 from matplotlib.cbook import normalize_kwargs
 from matplotlib.collections import PathCollection
+from matplotlib.figure import Figure
 from matplotlib.lines import Line2D
-from matplotlib.pyplot import subplots
+from matplotlib.pyplot import close, subplots
 from matplotlib.text import Text
 
-__all__ = ["create_plotting_grid", "line", "scatter"]
+__all__ = [
+    "create_plotting_grid",
+    "clear_plotting_grid",
+    "close_chart",
+    "disable_autoscale",
+    "set_limits",
+    "rasterization_policy",
+    "data_precision",
+    "line",
+    "scatter",
+    "image",
+]
 
 
 class UnsetDefault:
@@ -17,6 +33,9 @@ class UnsetDefault:
 
 unset = UnsetDefault()
 
+_rasterize_threshold = ContextVar("rasterize_threshold", default=None)
+_data_dtype = ContextVar("data_dtype", default=None)
+
 
 def create_plotting_grid(
     number,
@@ -27,6 +46,7 @@ def create_plotting_grid(
     sharey=False,
     polar=False,
     subplot_kws=None,
+    pyplot=True,
     **kwargs
 ):
     """Create a chart with a grid of plotting targets in it.
@@ -42,6 +62,11 @@ def create_plotting_grid(
     polar : bool
     subplot_kws : bool
         Passed to `~matplotlib.pyplot.subplots` as ``subplot_kw``
+    pyplot : bool, default True
+        If False, the figure is created directly as a `~matplotlib.figure.Figure`
+        with an Agg canvas instead of through `~matplotlib.pyplot`. It is then not
+        registered in pyplot's global figure manager, so it is freed once no
+        longer referenced and charts can be created and rendered from multiple threads.
     **kwargs: dict, optional
         Passed to `~matplotlib.pyplot.subplots`
 
@@ -55,9 +80,34 @@ def create_plotting_grid(
     subplot_kws = subplot_kws.copy()
     if polar:
         subplot_kws["projection"] = "polar"
-    fig, axes = subplots(
-        rows, cols, sharex=sharex, sharey=sharey, squeeze=squeeze, subplot_kw=subplot_kws, **kwargs
-    )
+    if pyplot:
+        fig, axes = subplots(
+            rows,
+            cols,
+            sharex=sharex,
+            sharey=sharey,
+            squeeze=squeeze,
+            subplot_kw=subplot_kws,
+            **kwargs,
+        )
+    else:
+        # same split of kwargs between figure and grid as in pyplot.subplots
+        grid_kws = {
+            key: kwargs.pop(key)
+            for key in ("gridspec_kw", "width_ratios", "height_ratios")
+            if key in kwargs
+        }
+        fig = Figure(**kwargs)
+        FigureCanvasAgg(fig)
+        axes = fig.subplots(
+            rows,
+            cols,
+            sharex=sharex,
+            sharey=sharey,
+            squeeze=squeeze,
+            subplot_kw=subplot_kws,
+            **grid_kws,
+        )
     extra = (rows * cols) - number
     if extra > 0:
         for i, ax in enumerate(axes.ravel("C")):
@@ -66,6 +116,115 @@ def create_plotting_grid(
     return fig, axes
 
 
+def clear_plotting_grid(number, chart, plots):
+    """Remove all artists from a chart created by :func:`create_plotting_grid`.
+
+    The figure and axes layout are kept so they can be reused.
+
+    Parameters
+    ----------
+    number : int
+        Number of axes in use
+    chart : `~matplotlib.figure.Figure`
+    plots : `~matplotlib.axes.Axes` or ndarray of `~matplotlib.axes.Axes`
+    """
+    for artist in [*chart.legends, *chart.texts]:
+        artist.remove()
+    for i, ax in enumerate(np.ravel(plots, "C")):
+        ax.cla()
+        if i >= number:
+            ax.set_axis_off()
+
+
+def close_chart(chart):
+    """Release the resources associated to `chart`."""
+    if chart.canvas.manager is not None:
+        close(chart)
+
+
+def disable_autoscale(target, axis="both"):
+    """Stop updating the limits of `target` when artists are added to it.
+
+    Parameters
+    ----------
+    target : `~matplotlib.axes.Axes`
+    axis : {"both", "x", "y"}
+    """
+    target.autoscale(enable=False, axis=axis)
+
+
+def set_limits(targets, x=None, y=None):
+    """Set the same limits on all `targets`.
+
+    Parameters
+    ----------
+    targets : sequence of `~matplotlib.axes.Axes`
+    x, y : tuple of (float, float), optional
+    """
+    for target in targets:
+        if x is not None:
+            target.set_xlim(x)
+        if y is not None:
+            target.set_ylim(y)
+
+
+@contextmanager
+def rasterization_policy(threshold):
+    """Rasterize large :func:`line` and :func:`scatter` artists created within this context.
+
+    Artists with more than `threshold` vertices are created with ``rasterized=True``
+    so vector exports (PDF, SVG...) stay small and fast, while axes, text and labels
+    are still drawn as vectors. Artists with an explicit ``rasterized`` argument are
+    not modified. The policy is local to the current thread.
+
+    Parameters
+    ----------
+    threshold : int or None
+        Maximum number of vertices drawn as vector graphics. None disables the policy.
+    """
+    token = _rasterize_threshold.set(threshold)
+    try:
+        yield
+    finally:
+        _rasterize_threshold.reset(token)
+
+
+@contextmanager
+def data_precision(dtype):
+    """Cast the floating point data of artists created within this context to `dtype`.
+
+    Use ``"float32"`` to halve the size of the data sent to the plotting library.
+    The policy is local to the current thread.
+
+    Parameters
+    ----------
+    dtype : dtype-like or None
+        None keeps the data as is.
+    """
+    token = _data_dtype.set(dtype)
+    try:
+        yield
+    finally:
+        _data_dtype.reset(token)
+
+
+def _cast(values):
+    dtype = _data_dtype.get()
+    if dtype is None:
+        return values
+    ary = np.asarray(values)
+    if ary.ndim == 0 or not np.issubdtype(ary.dtype, np.floating):
+        return values
+    return ary.astype(dtype, copy=False)
+
+
+def _apply_rasterization(artist, n_vertices, artist_kws):
+    threshold = _rasterize_threshold.get()
+    if threshold is not None and n_vertices > threshold and "rasterized" not in artist_kws:
+        artist.set_rasterized(True)
+    return artist
+
+
 def _filter_kwargs(kwargs, artist, artist_kws):
     kwargs = {key: value for key, value in kwargs.items() if value is not unset}
     if artist is not None:
@@ -75,7 +234,8 @@ def _filter_kwargs(kwargs, artist, artist_kws):
 
 def line(x, y, target, *, color=unset, alpha=unset, linewidth=unset, linestyle=unset, **artist_kws):
     kwargs = dict(color=color, alpha=alpha, linewidth=linewidth, linestyle=linestyle)
-    return target.plot(x, y, **_filter_kwargs(kwargs, Line2D, artist_kws))[0]
+    artist = target.plot(_cast(x), _cast(y), **_filter_kwargs(kwargs, Line2D, artist_kws))[0]
+    return _apply_rasterization(artist, len(artist.get_xydata()), artist_kws)
 
 
 def scatter(
@@ -94,9 +254,33 @@ def scatter(
     kwargs = dict(
         s=size, marker=marker, alpha=alpha, c=facecolor, edgecolors=edgecolor, linewidths=edgewidth
     )
-    return target.scatter(x, y, **_filter_kwargs(kwargs, None, artist_kws))
+    artist = target.scatter(_cast(x), _cast(y), **_filter_kwargs(kwargs, None, artist_kws))
+    return _apply_rasterization(artist, len(artist.get_offsets()), artist_kws)
 
 
 def text(x, y, string, target, *, size=unset, alpha=unset, color=unset, **artist_kws):
     kwargs = dict(fontsize=size, alpha=alpha, color=color)
     return target.text(x, y, string, **_filter_kwargs(kwargs, Text, artist_kws))
+
+
+def image(data, extent, target, *, cmap=unset, alpha=unset, **artist_kws):
+    """Draw `data` as an image covering `extent` with its first row at the bottom.
+
+    Parameters
+    ----------
+    data : array_like of shape (n_rows, n_cols)
+        NaN values are drawn transparent.
+    extent : sequence of float
+        ``(x_min, x_max, y_min, y_max)`` covered by the image.
+    target : `~matplotlib.axes.Axes`
+    cmap, alpha
+        Passed to `~matplotlib.axes.Axes.imshow`.
+    """
+    kwargs = dict(cmap=cmap, alpha=alpha)
+    artist_kws = {"aspect": "auto", "interpolation": "nearest", **artist_kws}
+    return target.imshow(
+        _cast(data),
+        extent=tuple(extent),
+        origin="lower",
+        **_filter_kwargs(kwargs, None, artist_kws),
+    )
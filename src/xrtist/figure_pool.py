@@ -0,0 +1,130 @@
+"""Pool of reusable charts for repeated layouts."""
+from collections import OrderedDict
+from importlib import import_module
+
+import numpy as np
+
+__all__ = ["FigurePool"]
+
+
+def _freeze(value):
+    """Convert `value` into a hashable object usable as part of a pool key."""
+    if isinstance(value, dict):
+        return tuple(sorted((key, _freeze(val)) for key, val in value.items()))
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(val) for val in value)
+    if isinstance(value, np.ndarray):
+        return (value.shape, tuple(value.ravel().tolist()))
+    hash(value)
+    return value
+
+
+class FigurePool:
+    """Reuse charts and plotting targets between plots with identical layouts.
+
+    Charts are keyed by backend and all the arguments passed to
+    ``create_plotting_grid``. Once a chart is no longer needed it should be
+    returned with :meth:`release`, it will then be cleared and handed out again
+    the next time the same layout is requested instead of creating a new one.
+
+    Parameters
+    ----------
+    max_size : int, default 8
+        Maximum number of idle charts kept in the pool. When exceeded,
+        the least recently released charts are closed and dropped.
+    max_per_layout : int, optional
+        Maximum number of idle charts kept for a single layout.
+
+    Examples
+    --------
+    Render the same layout for multiple models, only the first iteration
+    creates the figure:
+
+    .. code-block:: python
+
+        pool = FigurePool()
+        for idata in idatas:
+            pc = PlotMuseum.grid(idata.posterior, cols=["team"], figure_pool=pool)
+            pc.map(visuals.kde)
+            ...
+            pc.close()  # or pool.release(pc)
+    """
+
+    def __init__(self, max_size=8, max_per_layout=None):
+        self.max_size = max_size
+        self.max_per_layout = max_per_layout
+        self._idle = OrderedDict()
+        self._in_use = {}
+
+    def __len__(self):
+        return len(self._idle)
+
+    def get(self, backend, number, rows=1, cols=1, **kwargs):
+        """Get a chart with a grid of plotting targets in it.
+
+        Parameters
+        ----------
+        backend : str
+        number, rows, cols, **kwargs
+            Passed to ``create_plotting_grid`` of the requested backend.
+
+        Returns
+        -------
+        chart, plots
+            Same as ``create_plotting_grid``.
+        """
+        plot_bknd = import_module(f".backend.{backend}", package="xrtist")
+        try:
+            key = (backend, number, rows, cols, _freeze(kwargs))
+        except TypeError:
+            # unhashable layout arguments, pooling is not possible
+            return plot_bknd.create_plotting_grid(number, rows, cols, **kwargs)
+        for idle_id, (idle_key, chart, plots) in self._idle.items():
+            if idle_key == key:
+                del self._idle[idle_id]
+                break
+        else:
+            chart, plots = plot_bknd.create_plotting_grid(number, rows, cols, **kwargs)
+            if chart is None:
+                # squeezed single bokeh figure, no chart to identify it by
+                return chart, plots
+        self._in_use[id(chart)] = (key, chart, plots)
+        return chart, plots
+
+    def release(self, chart):
+        """Return a chart to the pool so it can be reused.
+
+        Parameters
+        ----------
+        chart : chart or PlotMuseum
+            Chart returned by :meth:`get` or a plot collection created with this pool.
+            Plot collections are closed, which releases their chart.
+        """
+        plot_collection = chart if hasattr(chart, "viz") else None
+        if plot_collection is not None:
+            chart = plot_collection.viz["chart"].item()
+        if id(chart) not in self._in_use:
+            raise ValueError("Only charts created by this pool can be released to it")
+        if plot_collection is not None:
+            plot_collection.close()
+            return
+        key, chart, plots = self._in_use.pop(id(chart))
+        plot_bknd = import_module(f".backend.{key[0]}", package="xrtist")
+        plot_bknd.clear_plotting_grid(key[1], chart, plots)
+        self._idle[id(chart)] = (key, chart, plots)
+        if self.max_per_layout is not None:
+            same_layout = [idle_id for idle_id, entry in self._idle.items() if entry[0] == key]
+            for idle_id in same_layout[: -self.max_per_layout or None]:
+                self._evict(idle_id)
+        while len(self._idle) > self.max_size:
+            self._evict(next(iter(self._idle)))
+
+    def clear(self):
+        """Close and drop all idle charts."""
+        for idle_id in list(self._idle):
+            self._evict(idle_id)
+
+    def _evict(self, idle_id):
+        key, chart, _ = self._idle.pop(idle_id)
+        plot_bknd = import_module(f".backend.{key[0]}", package="xrtist")
+        plot_bknd.close_chart(chart)
@@ -0,0 +1,160 @@
+"""Storage of plot collections as netCDF files or Zarr stores."""
+# pylint: disable=protected-access
+import json
+import warnings
+from importlib import import_module
+
+import numpy as np
+import xarray as xr
+from datatree import DataTree, open_datatree
+
+__all__ = ["save_museum", "load_museum"]
+
+
+def _encode_spec(obj):
+    """Encode objects not natively supported by json in a plot specification."""
+    if isinstance(obj, np.generic):
+        return obj.item()
+    if isinstance(obj, np.ndarray):
+        return obj.tolist()
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    if callable(obj):
+        module = getattr(obj, "__module__", None)
+        qualname = getattr(obj, "__qualname__", "")
+        if module is None or "<" in qualname:
+            raise TypeError(f"{obj!r} can't be referenced by its import path")
+        return {"__callable__": f"{module}:{qualname}"}
+    raise TypeError(f"Object of type {type(obj).__name__} is not serializable")
+
+
+_ALLOWED_MODULES = ("xrtist", "arviz", "numpy")
+
+
+def _in_modules(module, allowed_modules):
+    return any(module == allowed or module.startswith(f"{allowed}.") for allowed in allowed_modules)
+
+
+def _decode_spec(dct, allowed_modules=_ALLOWED_MODULES):
+    """Restore callables encoded by :func:`_encode_spec`.
+
+    Only public callables defined in `allowed_modules` or their submodules are
+    imported, anything else raises a ValueError.
+    """
+    if list(dct) != ["__callable__"]:
+        return dct
+    path = dct["__callable__"]
+    module, qualname = path.split(":")
+    attrs = qualname.split(".")
+    if not _in_modules(module, allowed_modules) or any(attr.startswith("_") for attr in attrs):
+        raise ValueError(
+            f"Refusing to load '{path}', only public callables from the modules "
+            f"{list(allowed_modules)} are allowed. Use `allowed_modules` to extend the list."
+        )
+    obj = import_module(module)
+    for attr in attrs:
+        obj = getattr(obj, attr)
+    # attribute access could reach objects imported from elsewhere, e.g. os.system
+    if not _in_modules(getattr(obj, "__module__", None) or module, allowed_modules):
+        raise ValueError(f"Refusing to load '{path}', it is defined in {obj.__module__}")
+    return obj
+
+
+def _zarr_path(path):
+    return str(path).rstrip("/").endswith(".zarr")
+
+
+def save_museum(plot_museum, path, **kwargs):
+    """Store `plot_museum` at `path`, see :meth:`xrtist.PlotMuseum.save`."""
+    if plot_museum._spec["layout"] is None:
+        raise ValueError("Only PlotMuseum objects created with .wrap or .grid can be saved")
+    map_calls = []
+    for call in plot_museum._spec["map_calls"]:
+        try:
+            map_calls.append(json.loads(json.dumps(call, default=_encode_spec)))
+        except TypeError as err:
+            warnings.warn(f"Skipping map call '{call['fun_label']}' when saving: {err}")
+    spec = {
+        "backend": plot_museum.backend,
+        **plot_museum.render_options,
+        "layout": plot_museum._spec["layout"],
+        "aes": plot_museum._aes,
+        "aes_kwargs": plot_museum._kwargs,
+        "map_calls": map_calls,
+    }
+    dt_dict = {"/": xr.Dataset(attrs={"xrtist_spec": json.dumps(spec, default=_encode_spec)})}
+    dt_dict["data"] = plot_museum.data
+    if plot_museum.preprocessed_data is not None:
+        dt_dict["preprocessed_data"] = plot_museum.preprocessed_data
+    if plot_museum.dt is not None:
+        for var_name, child in plot_museum.dt.children.items():
+            dt_dict[f"aes/{var_name}"] = child.to_dataset()
+    out = DataTree.from_dict(dt_dict)
+    if _zarr_path(path):
+        out.to_zarr(path, **kwargs)
+    else:
+        out.to_netcdf(path, **kwargs)
+
+
+def load_museum(
+    cls,
+    path,
+    *,
+    backend=None,
+    plot_grid_kws=None,
+    render=True,
+    allowed_modules=None,
+    **kwargs,
+):
+    """Rebuild a `cls` instance stored at `path`, see :meth:`xrtist.PlotMuseum.load`."""
+    if allowed_modules is None:
+        allowed_modules = []
+    allowed_modules = (*_ALLOWED_MODULES, *allowed_modules)
+    engine = "zarr" if _zarr_path(path) else None
+    dt = open_datatree(path, engine=engine).load()
+    spec = json.loads(
+        dt.attrs["xrtist_spec"],
+        object_hook=lambda dct: _decode_spec(dct, allowed_modules),
+    )
+    layout = spec["layout"]
+    method = getattr(cls, layout.pop("method"))
+    if plot_grid_kws is not None:
+        layout["plot_grid_kws"] = plot_grid_kws
+    plot_museum = method(
+        dt["data"].to_dataset(),
+        backend=spec["backend"] if backend is None else backend,
+        aes=spec["aes"],
+        rasterize_threshold=spec["rasterize_threshold"],
+        precision=spec.get("precision"),
+        **layout,
+        **{**spec["aes_kwargs"], **kwargs},
+    )
+    if "preprocessed_data" in dt.children:
+        plot_museum.preprocessed_data = dt["preprocessed_data"].to_dataset()
+    if "aes" in dt.children and not kwargs:
+        plot_museum.dt = DataTree()
+        for var_name, child in dt["aes"].children.items():
+            DataTree(name=var_name, parent=plot_museum.dt, data=child.to_dataset())
+    if render:
+        plot_bknd = import_module(f".backend.{plot_museum.backend}", package="xrtist")
+        for call in spec["map_calls"]:
+            shared_source = call.get("shared_source", False)
+            if not hasattr(plot_bknd, "create_source"):
+                # shared sources only reduce the output size, the plot is the same without them
+                shared_source = False
+            plot_museum.map(
+                call["fun"],
+                call["fun_label"],
+                coords=call["coords"],
+                ignore_aes=frozenset(call["ignore_aes"]),
+                preprocessed=call["preprocessed"],
+                subset_info=call["subset_info"],
+                store_artist=call["store_artist"],
+                artist_dims=call["artist_dims"],
+                raw=call.get("raw", False),
+                limits=call.get("limits"),
+                share_limits=call.get("share_limits"),
+                shared_source=shared_source,
+                **call["kwargs"],
+            )
+    return plot_museum
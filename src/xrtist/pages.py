@@ -0,0 +1,51 @@
+"""Splitting of facets into pages of charts."""
+import numpy as np
+
+__all__ = ["facet_pages", "variable_pages"]
+
+
+def facet_pages(sizes, dims, max_plots):
+    """Generate the isel dicts splitting the facets along `dims` in pages of at most `max_plots`.
+
+    Pages take whole values of the leading dims whenever possible. The first dim
+    whose trailing facets fit in a page is chunked, and each combination of the
+    dims before it gets its own pages.
+    """
+    shape = [sizes[dim] for dim in dims]
+    if np.prod(shape) <= max_plots:
+        yield {}
+        return
+    for split in range(len(dims)):
+        if np.prod(shape[split + 1 :]) <= max_plots:
+            break
+    step = max_plots // int(np.prod(shape[split + 1 :]))
+    for outer_idx in np.ndindex(*shape[:split]):
+        outer_isel = {dim: slice(i, i + 1) for dim, i in zip(dims[:split], outer_idx)}
+        for start in range(0, shape[split], step):
+            yield {**outer_isel, dims[split]: slice(start, start + step)}
+
+
+def variable_pages(data, facet_dims, plots_per_var, max_plots):
+    """Generate subsets of `data` with at most `max_plots` facets when facetting by variable.
+
+    Consecutive variables are grouped in the same page, variables with more
+    facets than fit in one page are split with :func:`facet_pages`.
+    `plots_per_var` maps each variable to its number of facets.
+    """
+    group = []
+    page_plots = 0
+    for var_name, n_plots in plots_per_var.items():
+        if group and page_plots + n_plots > max_plots:
+            yield data[group]
+            group = []
+            page_plots = 0
+        if n_plots > max_plots:
+            da = data[var_name]
+            var_dims = [dim for dim in facet_dims if dim in da.dims]
+            for page_isel in facet_pages(da.sizes, var_dims, max_plots):
+                yield data[[var_name]].isel(page_isel)
+            continue
+        group.append(var_name)
+        page_plots += n_plots
+    if group:
+        yield data[group]
@@ -1,4 +1,5 @@
 """Plot collection classes."""
+import weakref
 from importlib import import_module
 
 import numpy as np
@@ -6,6 +7,9 @@ import xarray as xr
 from arviz.sel_utils import xarray_sel_iter
 from datatree import DataTree
 
+from .io import load_museum, save_museum
+from .pages import facet_pages, variable_pages
+
 
 def sel_subset(sel, present_dims):
     return {key: value for key, value in sel.items() if key in present_dims}
@@ -22,6 +26,44 @@ def subset_ds(ds, var_name, sel):
     return out.values
 
 
+def _loop_dims_first(da, lead_dims):
+    """Get the values of `da` as a C-contiguous array with the dims in `lead_dims` first.
+
+    Subsets along the lead dims are then contiguous views which can be raveled without
+    copying. The values are only copied if they aren't already in that layout.
+    """
+    return np.ascontiguousarray(da.transpose(*lead_dims, ...).values)
+
+
+def _release_artists(ds, plot_bknd, close_charts=True):
+    """Close the charts in `ds` and drop all references to artists stored in it."""
+    for var_name, da in ds.data_vars.items():
+        if da.dtype != object:
+            continue
+        if var_name == "chart" and close_charts:
+            for chart in np.ravel(da.values):
+                if chart is not None:
+                    plot_bknd.close_chart(chart)
+        da.values.fill(None)
+
+
+def _cast_floating(da, dtype):
+    """Cast `da` to `dtype` if it contains floating point values."""
+    if np.issubdtype(da.dtype, np.floating):
+        return da.astype(dtype, copy=False)
+    return da
+
+
+def _weak_artist(artist):
+    """Get a weak reference to `artist` if it supports them, the artist itself otherwise."""
+    if artist is None:
+        return None
+    try:
+        return weakref.ref(artist)
+    except TypeError:
+        return artist
+
+
 def _process_facet_dims(data, facet_dims):
     if not facet_dims:
         return 1, {}
@@ -221,17 +263,44 @@ class PlotCollection:
             if store_artist:
                 self.viz[fun_label].loc[sel] = aux_artist
 
+    def close(self):
+        """Close the charts and release all the artists stored in `viz`."""
+        plot_bknd = import_module(f".backend.{self.backend}", package="xrtist")
+        _release_artists(self.viz, plot_bknd)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
     def add_legend(self, aes, artist, **kwargs):
         pass
 
 
 class PlotMuseum:
-    def __init__(self, data, viz_dt, aes_dt=None, aes=None, backend=None, **kwargs):
+    def __init__(
+        self,
+        data,
+        viz_dt,
+        aes_dt=None,
+        aes=None,
+        backend=None,
+        rasterize_threshold=None,
+        precision=None,
+        **kwargs,
+    ):
 
+        if precision is not None:
+            data = data.map(_cast_floating, dtype=precision)
         self.data = data
         self.preprocessed_data = None
         self.viz = viz_dt
         self.dt = aes_dt
+        self.render_options = {"rasterize_threshold": rasterize_threshold, "precision": precision}
+        self._spec = {"layout": None, "map_calls": []}
+        # state tied to the charts, released by close
+        self._resources = {"shared_sources": {}, "raw_arrays": {}, "figure_pool": None}
 
         if backend is not None:
             self.backend = backend
@@ -275,6 +344,11 @@ class PlotMuseum:
             return set(self.viz["plot"].dims)
         return set(dim for da in self.viz.children.values() for dim in da["plot"].dims)
 
+    @property
+    def shared_sources(self):
+        """Data sources shared between facets with ``map(..., shared_source=...)``, by variable."""
+        return self._resources["shared_sources"]
+
     def get_viz(self, var_name):
         return self.viz if "plot" in self.viz.data_vars else self.viz[var_name]
 
@@ -286,10 +360,27 @@ class PlotMuseum:
         col_wrap=4,
         backend="matplotlib",
         plot_grid_kws=None,
+        figure_pool=None,
+        max_plots_per_chart=None,
         **kwargs,
     ):
         if cols is None:
             cols = []
+        if max_plots_per_chart is not None:
+            if max_plots_per_chart < 1:
+                raise ValueError(
+                    f"max_plots_per_chart must be a positive integer, not {max_plots_per_chart}"
+                )
+            return cls._wrap_pages(
+                data,
+                cols,
+                max_plots_per_chart,
+                col_wrap=col_wrap,
+                backend=backend,
+                plot_grid_kws=plot_grid_kws,
+                figure_pool=figure_pool,
+                **kwargs,
+            )
         if plot_grid_kws is None:
             plot_grid_kws = {}
 
@@ -301,10 +392,15 @@ class PlotMuseum:
             n_rows = div_mod[0] + (div_mod[1] != 0)
             n_cols = col_wrap
 
-        plot_bknd = import_module(f".backend.{backend}", package="xrtist")
-        fig, ax_ary = plot_bknd.create_plotting_grid(
-            n_plots, n_rows, n_cols, squeeze=False, **plot_grid_kws
-        )
+        if figure_pool is None:
+            plot_bknd = import_module(f".backend.{backend}", package="xrtist")
+            fig, ax_ary = plot_bknd.create_plotting_grid(
+                n_plots, n_rows, n_cols, squeeze=False, **plot_grid_kws
+            )
+        else:
+            fig, ax_ary = figure_pool.get(
+                backend, n_plots, n_rows, n_cols, squeeze=False, **plot_grid_kws
+            )
         col_id, row_id = np.meshgrid(np.arange(n_cols), np.arange(n_rows))
         viz_dict = {}
         flat_ax_ary = ax_ary.flatten()[:n_plots]
@@ -352,7 +448,41 @@ class PlotMuseum:
                     }
                 )
         viz_dt = DataTree.from_dict(viz_dict)
-        return cls(data, viz_dt, backend=backend, **kwargs)
+        plot_museum = cls(data, viz_dt, backend=backend, **kwargs)
+        plot_museum._resources["figure_pool"] = figure_pool  # pylint: disable=protected-access
+        plot_museum._spec["layout"] = {  # pylint: disable=protected-access
+            "method": "wrap",
+            "cols": list(cols),
+            "col_wrap": col_wrap,
+            "plot_grid_kws": plot_grid_kws,
+        }
+        return plot_museum
+
+    @classmethod
+    def _wrap_pages(cls, data, cols, max_plots_per_chart, figure_pool=None, **kwargs):
+        """Generate one PlotMuseum per page of at most `max_plots_per_chart` facets.
+
+        Pages group whole variables (if facetting by ``"__variable__"``) or whole
+        values of the first facetting dimensions when possible, otherwise they
+        split along the following ones. Each page is closed, or released to `figure_pool`,
+        as soon as the next one is requested so only one is alive at any time.
+        """
+        if "__variable__" in cols:
+            facet_dims = [dim for dim in cols if dim != "__variable__"]
+            _, plots_per_var = _process_facet_dims(data, cols)
+            subsets = variable_pages(data, facet_dims, plots_per_var, max_plots_per_chart)
+        else:
+            subsets = (
+                data.isel(page_isel)
+                for page_isel in facet_pages(data.sizes, cols, max_plots_per_chart)
+            )
+        for subset in subsets:
+            page = cls.wrap(subset, cols=cols, figure_pool=figure_pool, **kwargs)
+            try:
+                yield page
+            finally:
+                # also releases the chart to figure_pool, a no-op if the page is already closed
+                page.close()
 
     @classmethod
     def grid(
@@ -362,6 +492,7 @@ class PlotMuseum:
         rows=None,
         backend="matplotlib",
         plot_grid_kws=None,
+        figure_pool=None,
         **kwargs,
     ):
         if cols is None:
@@ -378,10 +509,15 @@ class PlotMuseum:
         n_rows, rows_per_var = _process_facet_dims(data, rows)
 
         n_plots = n_cols * n_rows
-        plot_bknd = import_module(f".backend.{backend}", package="xrtist")
-        fig, ax_ary = plot_bknd.create_plotting_grid(
-            n_plots, n_rows, n_cols, squeeze=False, **plot_grid_kws
-        )
+        if figure_pool is None:
+            plot_bknd = import_module(f".backend.{backend}", package="xrtist")
+            fig, ax_ary = plot_bknd.create_plotting_grid(
+                n_plots, n_rows, n_cols, squeeze=False, **plot_grid_kws
+            )
+        else:
+            fig, ax_ary = figure_pool.get(
+                backend, n_plots, n_rows, n_cols, squeeze=False, **plot_grid_kws
+            )
         col_id, row_id = np.meshgrid(np.arange(n_cols), np.arange(n_rows))
         viz_dict = {}
         if "__variable__" not in cols and "__variable__" not in rows:
@@ -434,7 +570,15 @@ class PlotMuseum:
                     }
                 )
         viz_dt = DataTree.from_dict(viz_dict)
-        return cls(data, viz_dt, backend=backend, **kwargs)
+        plot_museum = cls(data, viz_dt, backend=backend, **kwargs)
+        plot_museum._resources["figure_pool"] = figure_pool  # pylint: disable=protected-access
+        plot_museum._spec["layout"] = {  # pylint: disable=protected-access
+            "method": "grid",
+            "cols": list(cols),
+            "rows": list(rows),
+            "plot_grid_kws": plot_grid_kws,
+        }
+        return plot_museum
 
     def _update_aes(self, ignore_aes, coords):
         aes = [aes_key for aes_key in self._aes.keys() if aes_key not in ignore_aes]
@@ -461,10 +605,16 @@ class PlotMuseum:
         subset_info=False,
         store_artist=True,
         artist_dims=None,
+        raw=False,
+        limits=None,
+        share_limits=None,
+        shared_source=False,
         **kwargs,
     ):
         if coords is None:
             coords = {}
+        if store_artist not in (True, False, "weak"):
+            raise ValueError(f"store_artist must be True, False or 'weak', not {store_artist}")
         if self.dt is None:
             self.generate_aes_dt(self._aes, **self._kwargs)
         if artist_dims is None:
@@ -473,6 +623,13 @@ class PlotMuseum:
             fun_label = fun.__name__
 
         data = self.data.sel(coords)
+        plot_bknd = import_module(f".backend.{self.backend}", package="xrtist")
+        if shared_source is True:
+            source_columns = []
+        else:
+            source_columns = list(shared_source) if shared_source else None
+        if source_columns is not None and not hasattr(plot_bknd, "create_source"):
+            raise ValueError(f"The {self.backend} backend doesn't support shared data sources")
 
         aes, all_loop_dims = self._update_aes(ignore_aes, coords)
         plotters = xarray_sel_iter(
@@ -494,8 +651,19 @@ class PlotMuseum:
                     coords={dim: data[dim] for dim in inherited_dims},
                 )
 
+        if limits is not None:
+            axis = "both" if len(limits) == 2 else list(limits)[0]
+            for var_name in data.data_vars:
+                plots = self.get_viz(var_name)["plot"]
+                for target in np.ravel(plots.sel(sel_subset(coords, plots.dims)).values):
+                    plot_bknd.disable_autoscale(target, axis=axis)
+
+        source_dims = {}
         for var_name, sel, isel in plotters:
-            da = data[var_name].sel(sel)
+            if raw:
+                da = self._raw_subset(var_name, all_loop_dims, isel, coords)
+            else:
+                da = data[var_name].sel(sel)
             sel_plus = {**sel, **coords}
             target = subset_ds(self.get_viz(var_name), "plot", sel_plus)
 
@@ -511,12 +679,305 @@ class PlotMuseum:
                         "You must manually set the `preprocessed_data` to use preprocessed=True"
                     )
                 pre_da = self.preprocessed_data.sel(sel_subset(sel, self.preprocessed_data.dims))
+                if self.render_options["precision"] is not None:
+                    pre_da = pre_da.map(_cast_floating, dtype=self.render_options["precision"])
                 fun_kwargs["preprocessed_data"] = pre_da
+            if source_columns is not None:
+                if var_name not in source_dims:
+                    source_dims[var_name] = self._shared_source(var_name, source_columns, plot_bknd)
+                fun_kwargs["source"] = self.shared_sources[var_name]
+                fun_kwargs["view"] = plot_bknd.source_view(
+                    [self.data.sizes[dim] for dim in source_dims[var_name]],
+                    [
+                        (
+                            self.data.get_index(dim).get_indexer(np.atleast_1d(sel_plus[dim]))
+                            if dim in sel_plus
+                            else None
+                        )
+                        for dim in source_dims[var_name]
+                    ],
+                )
             if subset_info:
                 fun_kwargs = {**fun_kwargs, "var_name": var_name, "sel": sel, "isel": isel}
-            aux_artist = fun(da, target=target, **fun_kwargs)
-            if store_artist:
+            with plot_bknd.rasterization_policy(self.render_options["rasterize_threshold"]):
+                with plot_bknd.data_precision(self.render_options["precision"]):
+                    aux_artist = fun(da, target=target, **fun_kwargs)
+            if store_artist == "weak":
+                self.viz[var_name][fun_label].loc[sel] = _weak_artist(aux_artist)
+            elif store_artist:
                 self.viz[var_name][fun_label].loc[sel] = aux_artist
 
+        if limits is not None:
+            self._set_limits(data, coords, limits, share_limits, plot_bknd)
+
+        # only calls that succeeded are recorded, otherwise load would fail replaying them
+        self._spec["map_calls"].append(
+            {
+                "fun": fun,
+                "fun_label": fun_label,
+                "coords": coords,
+                "ignore_aes": ignore_aes,
+                "preprocessed": preprocessed,
+                "subset_info": subset_info,
+                "store_artist": store_artist,
+                "artist_dims": artist_dims,
+                "raw": raw,
+                "limits": limits,
+                "share_limits": share_limits,
+                "shared_source": shared_source,
+                "kwargs": kwargs,
+            }
+        )
+
+    def _raw_subset(self, var_name, loop_dims, isel, coords):
+        """Get the values of `var_name` at `isel` and `coords` as a flat array.
+
+        The variable is stored as a C-contiguous array with the loop and `coords` dims
+        first, cached until :meth:`close`. Subsets are then views of that array, so
+        repeated ``raw=True`` calls with the same loop dims don't copy the data again.
+        """
+        da = self.data[var_name]
+        lead_dims = [dim for dim in da.dims if dim in loop_dims]
+        lead_dims.extend(dim for dim in coords if dim in da.dims)
+        raw_arrays = self._resources["raw_arrays"]
+        key = (var_name, tuple(lead_dims))
+        if key not in raw_arrays:
+            raw_arrays[key] = _loop_dims_first(da, lead_dims)
+        index = []
+        for dim in lead_dims:
+            if dim in loop_dims:
+                index.append(isel[dim])
+            elif np.ndim(coords[dim]) == 0:
+                index.append(da.get_index(dim).get_loc(coords[dim]))
+            else:
+                index.append(da.get_index(dim).get_indexer(coords[dim]))
+        return raw_arrays[key][tuple(index)].ravel()
+
+    def _shared_source(self, var_name, columns, plot_bknd):
+        """Get the dims of the values of `var_name` stored in its shared data source.
+
+        The source is created the first time it is needed with a ``value`` column
+        with the flattened values of the variable. Dimensions along which the
+        variable is only a broadcasted view, e.g. added with ``expand_dims`` to link
+        multiple views of the same data, are not repeated in the source.
+        The positions along the dimensions in `columns` are added as columns named after
+        the dimension the first time they are requested, using the smallest integer type
+        that fits them, at most int32.
+        """
+        da = self.data[var_name]
+        ary = da.values
+        dims = [
+            dim
+            for dim, stride, size in zip(da.dims, ary.strides, ary.shape)
+            if stride != 0 or size == 1
+        ]
+        ary = ary[tuple(slice(None) if dim in dims else 0 for dim in da.dims)]
+        if var_name not in self.shared_sources:
+            self.shared_sources[var_name] = plot_bknd.create_source({"value": np.ravel(ary)})
+        source = self.shared_sources[var_name]
+        new_columns = {}
+        for dim in columns:
+            if str(dim) in source.data:
+                continue
+            if dim not in dims:
+                raise ValueError(
+                    f"Dimension {dim} can't be a column of the shared source of {var_name}, "
+                    f"valid dimensions are {dims}"
+                )
+            dtype = np.min_scalar_type(da.sizes[dim] - 1)
+            positions = np.arange(da.sizes[dim], dtype=dtype if dtype.itemsize <= 2 else np.int32)
+            new_columns[str(dim)] = np.ravel(
+                np.broadcast_to(
+                    positions.reshape([-1 if dim_ == dim else 1 for dim_ in dims]), ary.shape
+                )
+            )
+        if new_columns:
+            plot_bknd.add_source_columns(source, new_columns)
+        return dims
+
+    def _set_limits(self, data, coords, limits, share_limits, plot_bknd):
+        """Compute the limits of each target with vectorized reductions and set them once.
+
+        `limits` maps axes to the data they should cover, either ``"data"`` for the
+        data being mapped or the name of a variable in `preprocessed_data`.
+        `share_limits` maps axes to ``"row"``, ``"col"`` or ``"all"`` to use
+        common limits for targets in the same row, column or in the whole chart.
+        """
+        if share_limits is None:
+            share_limits = {}
+        target_limits = {}
+        for var_name in data.data_vars:
+            viz = self.get_viz(var_name)
+            facets = [
+                viz[name].sel(sel_subset(coords, viz[name].dims)) for name in ("plot", "row", "col")
+            ]
+            bounds = []
+            for source in limits.values():
+                if source == "data":
+                    da = data[var_name]
+                else:
+                    if self.preprocessed_data is None:
+                        raise ValueError(
+                            "You must manually set the `preprocessed_data` to use it for limits"
+                        )
+                    da = self.preprocessed_data[source]
+                    da = da.sel(sel_subset(coords, da.dims))
+                reduce_dims = [dim for dim in da.dims if dim not in facets[0].dims]
+                bounds.extend((da.min(reduce_dims), da.max(reduce_dims)))
+            arrays = [np.ravel(ary.values) for ary in xr.broadcast(*facets, *bounds)]
+            for target, row, col, *target_bounds in zip(*arrays):
+                entry = target_limits.setdefault(
+                    id(target), {"target": target, "row": row, "col": col}
+                )
+                for i, axis in enumerate(limits):
+                    low, high = target_bounds[2 * i], target_bounds[2 * i + 1]
+                    if axis in entry:
+                        low, high = min(entry[axis][0], low), max(entry[axis][1], high)
+                    entry[axis] = (low, high)
+
+        # targets sharing limits are set together so backends can link them
+        for axis in limits:
+            share = share_limits.get(axis)
+            groups = {}
+            for target_id, entry in target_limits.items():
+                group = target_id if share is None else (0 if share == "all" else entry[share])
+                groups.setdefault(group, []).append(entry)
+            for entries in groups.values():
+                low = min(entry[axis][0] for entry in entries)
+                high = max(entry[axis][1] for entry in entries)
+                pad = 0.05 * (high - low) if high > low else 0.5
+                plot_bknd.set_limits(
+                    [entry["target"] for entry in entries], **{axis: (low - pad, high + pad)}
+                )
+
+    def save(self, path, **kwargs):
+        """Store the plot specification and data so it can be rendered again with :meth:`load`.
+
+        The data, preprocessed data, aesthetics and the layout and `map` calls are stored,
+        but not the artists. Functions passed to `map` and callables within its
+        keyword arguments are stored by import path, `map` calls that can't be stored
+        are skipped with a warning. See :meth:`load` for the modules they can come from.
+
+        Parameters
+        ----------
+        path : str or path-like
+            Paths ending in ``.zarr`` are stored as Zarr stores, all others as netCDF files.
+        **kwargs
+            Passed to :meth:`datatree.DataTree.to_zarr` or :meth:`datatree.DataTree.to_netcdf`.
+        """
+        save_museum(self, path, **kwargs)
+
+    @classmethod
+    def load(
+        cls,
+        path,
+        backend=None,
+        plot_grid_kws=None,
+        render=True,
+        allowed_modules=None,
+        **kwargs,
+    ):
+        """Rebuild a PlotMuseum stored with :meth:`save`.
+
+        .. warning::
+
+           Loading a file imports and calls the functions referenced in it,
+           so only load files from trusted sources. By default, only callables
+           from ``xrtist``, ``arviz`` and ``numpy`` are accepted.
+
+        Parameters
+        ----------
+        path : str or path-like
+        backend : str, optional
+            Plotting backend to use. Defaults to the one used when saving.
+            `map` calls using ``shared_source`` are replayed without it on
+            backends that don't support shared data sources.
+        plot_grid_kws : dict, optional
+            Overrides the stored ``plot_grid_kws``.
+        render : bool, default True
+            Replay the stored `map` calls on the new charts.
+        allowed_modules : sequence of str, optional
+            Additional modules, e.g. the one with your custom visuals, from which
+            callables can be imported. Their submodules are allowed too.
+        **kwargs
+            Overrides the stored aesthetic values, e.g. ``color=[...]``.
+            The aesthetics are then regenerated instead of restored.
+
+        Returns
+        -------
+        PlotMuseum
+        """
+        return load_museum(
+            cls,
+            path,
+            backend=backend,
+            plot_grid_kws=plot_grid_kws,
+            render=render,
+            allowed_modules=allowed_modules,
+            **kwargs,
+        )
+
+    def close(self):
+        """Close the charts and release all the artists stored in `viz`.
+
+        Artists stored with ``store_artist="weak"`` in :meth:`map` are only weakly
+        referenced, so they are freed with their charts even if `close` is never called.
+        Charts created with a `figure_pool` are released to it instead of closed.
+        The record of `map` calls kept for :meth:`save` and the arrays cached for
+        ``raw=True`` are cleared too.
+        """
+        plot_bknd = import_module(f".backend.{self.backend}", package="xrtist")
+        figure_pool = self._resources["figure_pool"]
+        if figure_pool is not None:
+            figure_pool.release(self.viz["chart"].item())
+            self._resources["figure_pool"] = None
+        for node in self.viz.subtree:
+            _release_artists(node.ds, plot_bknd, close_charts=figure_pool is None)
+        self._resources["shared_sources"] = {}
+        self._resources["raw_arrays"] = {}
+        self._spec["map_calls"] = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def memory_usage(self):
+        """Report the memory held by the PlotMuseum.
+
+        Returns
+        -------
+        dict
+            Bytes used by ``data``, ``preprocessed_data`` and the aesthetics (``aes``),
+            plus the number of ``charts``, plotting ``targets`` and live ``artists``
+            stored in `viz`.
+        """
+        report = {
+            "data": self.data.nbytes,
+            "preprocessed_data": (
+                0 if self.preprocessed_data is None else self.preprocessed_data.nbytes
+            ),
+            "aes": 0 if self.dt is None else sum(node.ds.nbytes for node in self.dt.subtree),
+            "charts": 0,
+            "targets": 0,
+            "artists": 0,
+        }
+        for node in self.viz.subtree:
+            for var_name, da in node.ds.data_vars.items():
+                if da.dtype != object:
+                    continue
+                objs = [
+                    obj() if isinstance(obj, weakref.ref) else obj for obj in np.ravel(da.values)
+                ]
+                n_live = sum(obj is not None for obj in objs)
+                if var_name == "chart":
+                    report["charts"] += n_live
+                elif var_name == "plot":
+                    report["targets"] += n_live
+                else:
+                    report["artists"] += n_live
+        return report
+
     def add_legend(self, aes, artist, **kwargs):
         pass
@@ -1,12 +1,161 @@
 import arviz as az
+import numpy as np
+import xarray as xr
 
-__all__ = ("kde",)
+__all__ = (
+    "kde",
+    "density_2d",
+    "sort_draws",
+    "ecdf",
+    "quantiles",
+    "eti",
+    "hdi",
+    "quantile_dots",
+)
 
 
-def kde(da, dims=None, grid_len=512, **kwargs):
+def _float_dtype(dtype):
+    """Floating point dtype for the results computed from data of type `dtype`.
+
+    float32 inputs keep float32 precision, integers and float64 give float64.
+    """
+    return np.result_type(dtype, np.float32)
+
+
+def _bw_batched(x, x_std, bw):
+    """Bandwidth for each row of a 2D array of samples."""
+    n_samples = x.shape[-1]
+    if isinstance(bw, str):
+        if bw == "scott":
+            return 1.06 * x_std * n_samples**-0.2
+        if bw == "silverman":
+            q75, q25 = np.percentile(x, [75, 25], axis=-1)
+            return 0.9 * np.minimum(x_std, (q75 - q25) / 1.34) * n_samples**-0.2
+        raise ValueError(
+            f"Unrecognized bandwidth method '{bw}' for the batched engine, "
+            "valid methods are 'scott' and 'silverman'"
+        )
+    bw = np.broadcast_to(np.asarray(bw, dtype=float), x_std.shape)
+    if np.any(bw <= 0):
+        raise ValueError("Numeric bandwidths must be positive")
+    return bw
+
+
+def _kde_batched(
+    x,
+    grid_len=512,
+    bw="silverman",
+    bw_fct=1,
+    shared_grid=False,
+    extend=False,
+    extend_fct=0,
+    bound_correction=True,
+    cumulative=False,
+):
+    """Gaussian KDE of all leading dimensions at once with a single FFT convolution.
+
+    Parameters
+    ----------
+    x : ndarray
+        Samples to estimate the density from. The last axis contains the samples,
+        all others are considered batch dimensions.
+
+    Returns
+    -------
+    grid, pdf : ndarray
+        Arrays of shape ``(*x.shape[:-1], grid_len)``
+    """
+    batch_shape = x.shape[:-1]
+    x = x.reshape(-1, x.shape[-1])
+    n_batch, n_samples = x.shape
+
+    x_min = x.min(axis=-1)
+    x_max = x.max(axis=-1)
+    x_std = x.std(axis=-1)
+    if extend and not bound_correction:
+        x_min = x_min - extend_fct * x_std
+        x_max = x_max + extend_fct * x_std
+    if shared_grid:
+        x_min = np.full(n_batch, x_min.min())
+        x_max = np.full(n_batch, x_max.max())
+    bin_width = (x_max - x_min) / grid_len
+
+    # bin all subsets at once by offsetting the bin indexes of each row
+    bin_idx = (
+        np.clip(((x - x_min[:, None]) / bin_width[:, None]).astype(int), 0, grid_len - 1)
+        + grid_len * np.arange(n_batch)[:, None]
+    )
+    grid_counts = np.bincount(bin_idx.ravel(), minlength=n_batch * grid_len).reshape(
+        n_batch, grid_len
+    )
+    f = grid_counts / bin_width[:, None] / n_samples
+
+    # bandwidth in bin units
+    bw = bw_fct * _bw_batched(x, x_std, bw) / bin_width
+
+    npad = grid_len // 5 if bound_correction else 0
+    if npad:
+        f = np.concatenate((f[:, npad - 1 :: -1], f, f[:, : grid_len - npad - 1 : -1]), axis=-1)
+    # zero padding up to twice the length avoids wrapping around in the circular convolution
+    fft_len = 2 * f.shape[-1]
+    freqs = np.fft.rfftfreq(fft_len)
+    kernel = np.exp(-2 * (np.pi * freqs[None, :] * bw[:, None]) ** 2)
+    pdf = np.fft.irfft(np.fft.rfft(f, n=fft_len, axis=-1) * kernel, n=fft_len, axis=-1)
+    pdf = pdf[:, npad : npad + grid_len]
+
+    if cumulative:
+        pdf = pdf.cumsum(axis=-1) / pdf.sum(axis=-1, keepdims=True)
+
+    grid = x_min[:, None] + bin_width[:, None] * (np.arange(grid_len) + 0.5)
+    dtype = _float_dtype(x.dtype)
+    return (
+        grid.reshape(*batch_shape, grid_len).astype(dtype, copy=False),
+        pdf.reshape(*batch_shape, grid_len).astype(dtype, copy=False),
+    )
+
+
+def kde(da, dims=None, grid_len=512, engine="arviz", shared_grid=False, **kwargs):
+    """Compute the KDE of all subsets of `da` defined by the dimensions not in `dims`.
+
+    Parameters
+    ----------
+    da : DataArray
+    dims : list of hashable, optional
+        Dimensions to reduce. Defaults to ``["chain", "draw"]``.
+    grid_len : int, default 512
+    engine : {"arviz", "batched"}, default "arviz"
+        With ``"arviz"``, `arviz.kde` is called once per subset.
+        With ``"batched"``, all subsets are binned together and the density is
+        estimated with a single FFT convolution along the grid axis.
+        It supports ``bw="scott"``, ``bw="silverman"`` (default) or numeric bandwidths.
+    shared_grid : bool, default False
+        Use the same grid for all subsets. Only available with the batched engine.
+    **kwargs
+        Passed to the KDE function of the selected engine.
+
+    Returns
+    -------
+    grid, pdf : DataArray
+    """
     if dims is None:
         dims = ["chain", "draw"]
-    return az.wrap_xarray_ufunc(
+    if engine == "batched":
+        return xr.apply_ufunc(
+            lambda ary: _kde_batched(
+                ary.reshape(*ary.shape[: -len(dims)], -1),
+                grid_len=grid_len,
+                shared_grid=shared_grid,
+                **kwargs,
+            ),
+            da,
+            input_core_dims=[dims],
+            output_core_dims=[["kde_dim"], ["kde_dim"]],
+        )
+    if engine != "arviz":
+        raise ValueError(f"Unrecognized engine '{engine}', valid options are 'arviz' and 'batched'")
+    if shared_grid:
+        raise ValueError("shared_grid=True is only available with engine='batched'")
+    grid, pdf = az.wrap_xarray_ufunc(
         az.kde,
         da,
         ufunc_kwargs={"n_output": 2, "n_input": 1, "n_dims": len(dims)},
@@ -14,3 +163,301 @@ def kde(da, dims=None, grid_len=512, **kwargs):
         output_core_dims=[["kde_dim"], ["kde_dim"]],
         input_core_dims=[dims],
     )
+    dtype = _float_dtype(da.dtype)
+    return grid.astype(dtype, copy=False), pdf.astype(dtype, copy=False)
+
+
+def _density_2d_batched(x, y, gridsize=(128, 128), extent=None, shared_extent=False):
+    """Count the points of all leading dimensions in 2D bins at once.
+
+    Parameters
+    ----------
+    x, y : ndarray
+        Coordinates of the points. The last axis contains the points,
+        all others are considered batch dimensions.
+
+    Returns
+    -------
+    counts : ndarray
+        Array of shape ``(*x.shape[:-1], gridsize[1], gridsize[0])``
+    extent : ndarray
+        Array of shape ``(*x.shape[:-1], 4)`` with ``(x_min, x_max, y_min, y_max)``
+    """
+    batch_shape = x.shape[:-1]
+    x = x.reshape(-1, x.shape[-1])
+    y = y.reshape(-1, y.shape[-1])
+    n_batch = x.shape[0]
+    n_x, n_y = gridsize
+
+    if extent is None:
+        extent = np.stack((x.min(axis=-1), x.max(axis=-1), y.min(axis=-1), y.max(axis=-1)), axis=-1)
+        if shared_extent:
+            extent = np.array(
+                [extent[:, 0].min(), extent[:, 1].max(), extent[:, 2].min(), extent[:, 3].max()]
+            )
+    extent = np.broadcast_to(np.asarray(extent, dtype=float), (n_batch, 4))
+    x_width = (extent[:, 1] - extent[:, 0]) / n_x
+    y_width = (extent[:, 3] - extent[:, 2]) / n_y
+
+    x_idx = np.floor((x - extent[:, :1]) / x_width[:, None])
+    y_idx = np.floor((y - extent[:, 2:3]) / y_width[:, None])
+    # points exactly on the upper edge belong to the last bin, points outside are dropped
+    x_idx[x == extent[:, 1:2]] = n_x - 1
+    y_idx[y == extent[:, 3:4]] = n_y - 1
+    inside = (x_idx >= 0) & (x_idx < n_x) & (y_idx >= 0) & (y_idx < n_y)
+    flat_idx = (np.arange(n_batch)[:, None] * n_y + y_idx) * n_x + x_idx
+    counts = np.bincount(flat_idx[inside].astype(int), minlength=n_batch * n_y * n_x)
+    return (
+        counts.reshape(*batch_shape, n_y, n_x),
+        extent.reshape(*batch_shape, 4).astype(_float_dtype(x.dtype), copy=False),
+    )
+
+
+def density_2d(da_x, da_y, dims=None, gridsize=(128, 128), extent=None, shared_extent=False):
+    """Count the points defined by `da_x` and `da_y` in a fixed resolution 2D grid.
+
+    The cost of drawing the result with :func:`xrtist.visuals.density_2d` depends
+    only on `gridsize`, not on the number of points.
+
+    Parameters
+    ----------
+    da_x, da_y : DataArray
+        Coordinates of the points.
+    dims : list of hashable, optional
+        Dimensions to reduce. Defaults to ``["chain", "draw"]``.
+    gridsize : tuple of int, default (128, 128)
+        Number of bins along the x and y axes.
+    extent : tuple of float, optional
+        ``(x_min, x_max, y_min, y_max)`` to use for all subsets. Points outside are ignored.
+        Defaults to the range of each subset.
+    shared_extent : bool, default False
+        Use the range of all subsets as extent of each subset.
+
+    Returns
+    -------
+    counts : DataArray
+        Counts with ``y_bin`` and ``x_bin`` dimensions.
+    extent : DataArray
+        Extent of the grid with ``extent_dim`` dimension.
+    """
+    if dims is None:
+        dims = ["chain", "draw"]
+    return xr.apply_ufunc(
+        lambda ary_x, ary_y: _density_2d_batched(
+            ary_x.reshape(*ary_x.shape[: -len(dims)], -1),
+            ary_y.reshape(*ary_y.shape[: -len(dims)], -1),
+            gridsize=gridsize,
+            extent=extent,
+            shared_extent=shared_extent,
+        ),
+        da_x,
+        da_y,
+        input_core_dims=[dims, dims],
+        output_core_dims=[["y_bin", "x_bin"], ["extent_dim"]],
+    )
+
+
+def sort_draws(da, dims=None):
+    """Sort all subsets of `da` with a single sort along the stacked `dims`.
+
+    The result can be passed to :func:`ecdf`, :func:`quantiles`, :func:`eti`,
+    :func:`hdi` and :func:`quantile_dots` so the draws are sorted only once.
+
+    Parameters
+    ----------
+    da : DataArray
+    dims : list of hashable, optional
+        Dimensions to stack and sort. Defaults to ``["chain", "draw"]``.
+
+    Returns
+    -------
+    DataArray
+        Sorted values along the new ``sorted_dim`` dimension.
+    """
+    if dims is None:
+        dims = ["chain", "draw"]
+    return xr.apply_ufunc(
+        lambda ary: np.sort(ary.reshape(*ary.shape[: -len(dims)], -1), axis=-1),
+        da,
+        input_core_dims=[dims],
+        output_core_dims=[["sorted_dim"]],
+    )
+
+
+def _get_sorted(da, dims):
+    """Sort `da` unless it is already the output of :func:`sort_draws`."""
+    if dims is None and "sorted_dim" in da.dims:
+        return da
+    return sort_draws(da, dims)
+
+
+def _quantiles_sorted(ary, probs):
+    """Linearly interpolated quantiles of `ary`, sorted along its last axis."""
+    pos = np.asarray(probs) * (ary.shape[-1] - 1)
+    low = np.floor(pos).astype(int)
+    high = np.ceil(pos).astype(int)
+    frac = pos - low
+    quants = ary[..., low] * (1 - frac) + ary[..., high] * frac
+    return quants.astype(_float_dtype(ary.dtype), copy=False)
+
+
+def _hdi_sorted(ary, prob):
+    """Highest density interval of `ary`, sorted along its last axis."""
+    n_samples = ary.shape[-1]
+    n_inside = int(np.floor(prob * n_samples))
+    widths = ary[..., n_inside:] - ary[..., : n_samples - n_inside]
+    idx = widths.argmin(axis=-1)[..., None]
+    return np.concatenate(
+        (np.take_along_axis(ary, idx, -1), np.take_along_axis(ary, idx + n_inside, -1)), axis=-1
+    )
+
+
+def _quantile_dots_sorted(ary, nquantiles, binwidth):
+    """Stack the quantiles of `ary`, sorted along its last axis, into columns of dots."""
+    quants = _quantiles_sorted(ary, (np.arange(nquantiles) + 0.5) / nquantiles)
+    if binwidth is None:
+        binwidth = (quants[..., -1] - quants[..., 0]) / np.sqrt(2 * np.pi * nquantiles)
+    binwidth = np.broadcast_to(np.asarray(binwidth, dtype=float), quants.shape[:-1])[..., None]
+    binwidth = np.where(binwidth > 0, binwidth, 1)
+    bins = np.floor((quants - quants[..., :1]) / binwidth)
+    # quantiles are sorted, so dots in the same bin are contiguous
+    new_bin = np.ones(quants.shape, dtype=bool)
+    new_bin[..., 1:] = bins[..., 1:] != bins[..., :-1]
+    position = np.arange(nquantiles)
+    bin_start = np.maximum.accumulate(np.where(new_bin, position, 0), axis=-1)
+    x = quants[..., :1] + (bins + 0.5) * binwidth
+    y = (position - bin_start + 0.5) * binwidth
+    return x.astype(quants.dtype, copy=False), y.astype(quants.dtype, copy=False)
+
+
+def ecdf(da, dims=None):
+    """Compute the empirical cumulative distribution function of all subsets of `da`.
+
+    Parameters
+    ----------
+    da : DataArray
+        Data or output of :func:`sort_draws`.
+    dims : list of hashable, optional
+        Dimensions to reduce. Defaults to ``["chain", "draw"]``,
+        or to ``sorted_dim`` if present.
+
+    Returns
+    -------
+    x, y : DataArray
+        Sorted values and cumulative probabilities along ``sorted_dim``.
+    """
+    x = _get_sorted(da, dims)
+    n_samples = x.sizes["sorted_dim"]
+    y = xr.DataArray(
+        (np.arange(1, n_samples + 1) / n_samples).astype(_float_dtype(x.dtype)),
+        dims=["sorted_dim"],
+    )
+    return x, y.broadcast_like(x)
+
+
+def quantiles(da, probs, dims=None):
+    """Compute quantiles of all subsets of `da` with linear interpolation.
+
+    Parameters
+    ----------
+    da : DataArray
+        Data or output of :func:`sort_draws`.
+    probs : array_like of float
+    dims : list of hashable, optional
+        Dimensions to reduce. Defaults to ``["chain", "draw"]``,
+        or to ``sorted_dim`` if present.
+
+    Returns
+    -------
+    DataArray
+        Quantiles along the ``quantile`` dimension.
+    """
+    probs = np.atleast_1d(probs)
+    out = xr.apply_ufunc(
+        _quantiles_sorted,
+        _get_sorted(da, dims),
+        kwargs={"probs": probs},
+        input_core_dims=[["sorted_dim"]],
+        output_core_dims=[["quantile"]],
+    )
+    return out.assign_coords(quantile=probs)
+
+
+def eti(da, prob=0.94, dims=None):
+    """Compute the equal tailed interval of all subsets of `da`.
+
+    Parameters
+    ----------
+    da : DataArray
+        Data or output of :func:`sort_draws`.
+    prob : float, default 0.94
+    dims : list of hashable, optional
+        Dimensions to reduce. Defaults to ``["chain", "draw"]``,
+        or to ``sorted_dim`` if present.
+
+    Returns
+    -------
+    DataArray
+        Interval limits along the ``eti`` dimension.
+    """
+    out = quantiles(da, [(1 - prob) / 2, (1 + prob) / 2], dims=dims)
+    return out.rename(quantile="eti").assign_coords(eti=["lower", "higher"])
+
+
+def hdi(da, prob=0.94, dims=None):
+    """Compute the highest density interval of all subsets of `da`.
+
+    Parameters
+    ----------
+    da : DataArray
+        Data or output of :func:`sort_draws`.
+    prob : float, default 0.94
+    dims : list of hashable, optional
+        Dimensions to reduce. Defaults to ``["chain", "draw"]``,
+        or to ``sorted_dim`` if present.
+
+    Returns
+    -------
+    DataArray
+        Interval limits along the ``hdi`` dimension.
+    """
+    out = xr.apply_ufunc(
+        _hdi_sorted,
+        _get_sorted(da, dims),
+        kwargs={"prob": prob},
+        input_core_dims=[["sorted_dim"]],
+        output_core_dims=[["hdi"]],
+    )
+    return out.assign_coords(hdi=["lower", "higher"])
+
+
+def quantile_dots(da, nquantiles=50, binwidth=None, dims=None):
+    """Compute the positions of the dots in a quantile dot plot of all subsets of `da`.
+
+    Each dot represents one of `nquantiles` quantiles. Dots are grouped in bins
+    of width `binwidth` and stacked on top of each other within each bin.
+
+    Parameters
+    ----------
+    da : DataArray
+        Data or output of :func:`sort_draws`.
+    nquantiles : int, default 50
+    binwidth : float, optional
+        Width of the bins and height of each dot. Defaults to the range of the quantiles
+        divided by ``sqrt(2 * pi * nquantiles)``.
+    dims : list of hashable, optional
+        Dimensions to reduce. Defaults to ``["chain", "draw"]``,
+        or to ``sorted_dim`` if present.
+
+    Returns
+    -------
+    x, y : DataArray
+        Dot centers along the ``dot_dim`` dimension.
+    """
+    return xr.apply_ufunc(
+        _quantile_dots_sorted,
+        _get_sorted(da, dims),
+        kwargs={"nquantiles": nquantiles, "binwidth": binwidth},
+        input_core_dims=[["sorted_dim"]],
+        output_core_dims=[["dot_dim"], ["dot_dim"]],
+    )
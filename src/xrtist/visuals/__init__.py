@@ -2,6 +2,10 @@ from importlib import import_module
 
 import arviz as az
 import numpy as np
+import xarray as xr
+
+from ..processing import density_2d as _density_2d
+from ..processing import quantile_dots as _quantile_dots
 
 
 def get_backend(target, kwargs):  # pylint: disable=unused-argument
@@ -17,7 +21,7 @@ def kde(values, target, **kwargs):
         grid = pre_ds["grid"]
         pdf = pre_ds["kde"]
     else:
-        grid, pdf = az.kde(np.array(values).flatten())
+        grid, pdf = az.kde(np.ravel(values))
     bkd = get_backend(target, kwargs)
     y = kwargs.pop("y", 0)
     return bkd.line(grid, pdf + y, target, **kwargs)
@@ -29,7 +33,7 @@ def interval(values, target, **kwargs):
         interval_values = pre_ds["interval"]
     else:
         int_func = kwargs.pop("interval_func", az.hdi)
-        interval_values = int_func(np.array(values).flatten())
+        interval_values = int_func(np.ravel(values))
     bkd = get_backend(target, kwargs)
     y = kwargs.pop("y", 0)
     return bkd.line(interval_values, [y, y], target=target, **kwargs)
@@ -41,7 +45,7 @@ def point(values, target, **kwargs):
         point_est = pre_ds["point_estimate"].item()
     else:
         point_func = kwargs.pop("point_func", np.mean)
-        point_est = point_func(np.array(values).flatten())
+        point_est = point_func(np.ravel(values))
     bkd = get_backend(target, kwargs)
     y = kwargs.pop("y", 0)
     return bkd.scatter(point_est, y, target, **kwargs)
@@ -56,7 +60,7 @@ def point_label(values, target, **kwargs):
     else:
         point_func = kwargs.pop("point_func", np.mean)
         point_est_label = kwargs.pop("point_label", point_func.__name__)
-        values = np.array(values).flatten()
+        values = np.ravel(values)
         point_est = point_func(values)
         _, pdf = az.kde(values)
 
@@ -64,3 +68,75 @@ def point_label(values, target, **kwargs):
 
     bkd = get_backend(target, kwargs)
     return bkd.text(point_est, 0.05 * top, f"{point_est:.2f} {point_est_label}", target, **kwargs)
+
+
+def density_2d(values, target, **kwargs):
+    if "preprocessed_data" in kwargs:
+        pre_ds = kwargs.pop("preprocessed_data")
+        counts = pre_ds["density_2d"]
+        extent = pre_ds["extent"]
+    else:
+        if not isinstance(values, xr.DataArray):
+            raise ValueError(
+                "density_2d needs a DataArray to find the x and y coordinates along `xy_dim`. "
+                "Use raw=False or provide the counts with preprocessed=True"
+            )
+        xy_dim = kwargs.pop("xy_dim", "xy_dim")
+        gridsize = kwargs.pop("gridsize", (128, 128))
+        dims = [dim for dim in values.dims if dim != xy_dim]
+        counts, extent = _density_2d(
+            values.isel({xy_dim: 0}), values.isel({xy_dim: 1}), dims=dims, gridsize=gridsize
+        )
+    counts = np.where(counts > 0, counts, np.nan)
+    bkd = get_backend(target, kwargs)
+    return bkd.image(counts, np.asarray(extent), target, **kwargs)
+
+
+def ecdf(values, target, **kwargs):
+    if "preprocessed_data" in kwargs:
+        pre_ds = kwargs.pop("preprocessed_data")
+        x = np.asarray(pre_ds["sorted_draws"])
+    else:
+        x = np.sort(np.ravel(values))
+    y = np.arange(1, len(x) + 1) / len(x)
+    bkd = get_backend(target, kwargs)
+    return bkd.line(np.repeat(x, 2)[1:], np.repeat(y, 2)[:-1], target, **kwargs)
+
+
+def quantile_dots(values, target, **kwargs):
+    if "preprocessed_data" in kwargs:
+        pre_ds = kwargs.pop("preprocessed_data")
+        x = pre_ds["dots_x"]
+        y = pre_ds["dots_y"]
+    else:
+        nquantiles = kwargs.pop("nquantiles", 50)
+        binwidth = kwargs.pop("binwidth", None)
+        x, y = _quantile_dots(
+            xr.DataArray(np.ravel(values), dims=["sample"]),
+            nquantiles=nquantiles,
+            binwidth=binwidth,
+            dims=["sample"],
+        )
+    bkd = get_backend(target, kwargs)
+    y_offset = kwargs.pop("y", 0)
+    return bkd.scatter(np.asarray(x), np.asarray(y) + y_offset, target, **kwargs)
+
+
+def scatter_draws(values, target, **kwargs):
+    x_dim = kwargs.pop("x", "draw")
+    bkd = get_backend(target, kwargs)
+    if "source" in kwargs:
+        if str(x_dim) not in kwargs["source"].data:
+            raise ValueError(
+                f"scatter_draws needs the positions along {x_dim} in the shared source, "
+                f"use shared_source=[{x_dim!r}]"
+            )
+        return bkd.scatter(str(x_dim), "value", target, **kwargs)
+    if not isinstance(values, xr.DataArray):
+        raise ValueError(
+            f"scatter_draws needs a DataArray to find the positions along {x_dim}. "
+            "Use raw=False or a shared data source"
+        )
+    x = xr.DataArray(np.arange(values.sizes[x_dim]), dims=[x_dim])
+    x = x.broadcast_like(values).transpose(*values.dims)
+    return bkd.scatter(np.ravel(x), np.ravel(values), target, **kwargs)
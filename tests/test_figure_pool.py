@@ -0,0 +1,61 @@
+# pylint: disable=no-self-use, redefined-outer-name
+import pytest
+
+from xarray_einstats import tutorial
+from xrtist import FigurePool, PlotMuseum, visuals
+
+
+@pytest.fixture(scope="module")
+def dataset():
+    ds = tutorial.generate_mcmc_like_dataset(3)[["mu"]]
+    ds["nu"] = 2 * ds["mu"]
+    return ds
+
+
+class TestFigurePool:
+    def test_reuse(self, dataset):
+        pool = FigurePool()
+        pc = PlotMuseum.grid(dataset, cols=["team"], figure_pool=pool)
+        chart = pc.viz["chart"].item()
+        pc.map(visuals.kde, "kde")
+        pool.release(pc)
+        assert len(pool) == 1
+        pc = PlotMuseum.grid(dataset, cols=["team"], figure_pool=pool)
+        assert pc.viz["chart"].item() is chart
+        assert len(pool) == 0
+        assert not pc.viz["plot"].values.flatten()[0].lines
+
+    def test_different_layout(self, dataset):
+        pool = FigurePool()
+        pc = PlotMuseum.grid(dataset, cols=["team"], figure_pool=pool)
+        pool.release(pc)
+        pc = PlotMuseum.grid(dataset, cols=["team"], rows=["chain"], figure_pool=pool)
+        assert len(pool) == 1
+        pool.clear()
+        assert len(pool) == 0
+
+    def test_eviction(self, dataset):
+        pool = FigurePool(max_size=1)
+        pcs = [PlotMuseum.wrap(dataset, cols=["team"], figure_pool=pool) for _ in range(3)]
+        for pc in pcs:
+            pool.release(pc)
+        assert len(pool) == 1
+
+    def test_release_unknown(self, dataset):
+        pool = FigurePool()
+        pc = PlotMuseum.wrap(dataset, cols=["team"])
+        with pytest.raises(ValueError, match="created by this pool"):
+            pool.release(pc)
+
+    def test_close_releases(self, dataset):
+        pool = FigurePool()
+        with PlotMuseum.wrap(dataset, cols=["team"], figure_pool=pool) as pc:
+            chart = pc.viz["chart"].item()
+            pc.map(visuals.kde)
+        assert len(pool) == 1
+        assert not pool._in_use  # pylint: disable=protected-access
+        assert pc.viz["chart"].item() is None
+        pc.close()
+        pc = PlotMuseum.wrap(dataset, cols=["team"], figure_pool=pool)
+        assert pc.viz["chart"].item() is chart
+        assert chart.canvas.manager is not None
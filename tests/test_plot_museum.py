@@ -0,0 +1,461 @@
+# pylint: disable=no-self-use, redefined-outer-name
+import gc
+import io
+from concurrent.futures import ThreadPoolExecutor
+
+import arviz as az
+import h5py
+import matplotlib.pyplot as plt
+import numpy as np
+import pytest
+import xarray as xr
+from bokeh.embed import file_html
+from bokeh.models import Range1d
+from bokeh.resources import CDN
+
+from xarray_einstats import tutorial
+from xrtist import FigurePool, PlotMuseum, processing, visuals
+
+
+def custom_visual(values, target, **kwargs):  # pylint: disable=unused-argument
+    return None
+
+
+@pytest.fixture(scope="module")
+def dataset():
+    ds = tutorial.generate_mcmc_like_dataset(3)[["mu"]]
+    ds["nu"] = 2 * ds["mu"]
+    return ds
+
+
+class TestPlotMuseumIO:
+    def test_save_load(self, dataset, tmp_path):
+        pc = PlotMuseum.wrap(
+            dataset,
+            cols=["__variable__", "team"],
+            aes={"color": ["chain"]},
+            color=["red", "blue"],
+        )
+        grid, pdf = processing.kde(dataset["mu"])
+        pc.preprocessed_data = xr.Dataset({"grid": grid, "kde": pdf})
+        pc.map(visuals.kde, preprocessed=True, ignore_aes={"color"})
+        pc.map(visuals.interval, interval_func=az.hdi)
+        pc.save(tmp_path / "museum.nc", engine="h5netcdf")
+
+        pc_loaded = PlotMuseum.load(tmp_path / "museum.nc", backend="bokeh")
+        assert pc_loaded.backend == "bokeh"
+        assert "kde" in pc_loaded.viz["mu"]
+        assert "interval" in pc_loaded.viz["nu"]
+        xr.testing.assert_identical(pc_loaded.preprocessed_data, pc.preprocessed_data)
+        assert (pc_loaded.dt["mu"]["color"] == pc.dt["mu"]["color"]).all()
+
+    def test_load_new_aes(self, dataset, tmp_path):
+        pc = PlotMuseum.grid(dataset, cols=["team"], aes={"color": ["chain"]}, color=["red"])
+        pc.map(visuals.point)
+        pc.save(tmp_path / "museum.nc", engine="h5netcdf")
+        pc_loaded = PlotMuseum.load(tmp_path / "museum.nc", render=False, color=["green"])
+        assert "mu" not in pc_loaded.viz.children
+        pc_loaded.map(visuals.point)
+        assert (pc_loaded.dt["mu"]["color"] == "green").all()
+
+    def test_skip_unsaveable_map(self, dataset, tmp_path):
+        pc = PlotMuseum.wrap(dataset, cols=["team"])
+        pc.map(lambda values, target, **kwargs: None, "noop", store_artist=False)
+        with pytest.warns(UserWarning, match="noop"):
+            pc.save(tmp_path / "museum.nc", engine="h5netcdf")
+
+    def test_failed_map_not_saved(self, dataset, tmp_path):
+        pc = PlotMuseum.wrap(dataset, cols=["team"])
+        pc.map(visuals.point)
+        with pytest.raises(ValueError, match="shared data sources"):
+            pc.map(visuals.scatter_draws, shared_source=True)
+        pc.save(tmp_path / "museum.nc", engine="h5netcdf")
+        pc_loaded = PlotMuseum.load(tmp_path / "museum.nc")
+        assert list(pc_loaded.viz["mu"].data_vars) == ["point"]
+        pc_loaded.close()
+        assert not pc_loaded._spec["map_calls"]  # pylint: disable=protected-access
+
+    def test_load_allowed_modules(self, dataset, tmp_path):
+        pc = PlotMuseum.wrap(dataset, cols=["team"])
+        pc.map(custom_visual)
+        pc.save(tmp_path / "museum.nc", engine="h5netcdf")
+        with pytest.raises(ValueError, match="custom_visual"):
+            PlotMuseum.load(tmp_path / "museum.nc")
+        pc_loaded = PlotMuseum.load(
+            tmp_path / "museum.nc", allowed_modules=[custom_visual.__module__]
+        )
+        assert "custom_visual" in pc_loaded.viz["mu"]
+
+    def test_load_rejects_reexported(self, dataset, tmp_path):
+        pc = PlotMuseum.wrap(dataset, cols=["team"])
+        pc.map(visuals.point)
+        pc.save(tmp_path / "museum.nc", engine="h5netcdf")
+        with h5py.File(tmp_path / "museum.nc", "r+") as file:
+            file.attrs["xrtist_spec"] = file.attrs["xrtist_spec"].replace(
+                "xrtist.visuals:point", "xrtist.visuals:import_module"
+            )
+        with pytest.raises(ValueError, match="importlib"):
+            PlotMuseum.load(tmp_path / "museum.nc")
+
+
+class TestPlotMuseumMap:
+    def test_raw(self, dataset):
+        ds = dataset.transpose("team", ...).map(lambda da: da.copy(data=np.ascontiguousarray(da)))
+        subsets = []
+
+        def collect(values, target, **kwargs):  # pylint: disable=unused-argument
+            subsets.append(values)
+
+        pc = PlotMuseum.wrap(ds, cols=["team"])
+        pc.map(collect, raw=True, store_artist=False)
+        assert len(subsets) == 12
+        assert all(isinstance(values, np.ndarray) and values.ndim == 1 for values in subsets)
+        assert np.shares_memory(subsets[0], ds["mu"].values)
+        np.testing.assert_array_equal(subsets[0], ds["mu"].isel(team=0).values.ravel())
+
+    def test_raw_cached(self, dataset):
+        subsets = []
+
+        def collect(values, target, **kwargs):  # pylint: disable=unused-argument
+            subsets.append(values)
+
+        ds = dataset.expand_dims(view=2)
+        pc = PlotMuseum.grid(ds, cols=["team"], rows=["view"])
+        pc.map(collect, raw=True, store_artist=False, coords={"view": 0})
+        pc.map(collect, raw=True, store_artist=False, coords={"view": 1})
+        pc.map(collect, raw=True, store_artist=False, coords={"view": 1})
+        n_subsets = len(subsets) // 3
+        # the layout with the team dim first is computed once and reused by later calls
+        assert np.shares_memory(subsets[n_subsets], subsets[2 * n_subsets])
+        assert len(pc._resources["raw_arrays"]) == 2  # pylint: disable=protected-access
+        np.testing.assert_array_equal(
+            subsets[n_subsets], ds["mu"].isel(team=0, view=1).values.ravel()
+        )
+        pc.close()
+        assert not pc._resources["raw_arrays"]  # pylint: disable=protected-access
+
+    def test_raw_visuals(self, dataset):
+        pc = PlotMuseum.wrap(dataset, cols=["team"], aes={"color": ["chain"]}, color=["C0"])
+        pc.map(visuals.kde, raw=True)
+        pc.map(visuals.point, raw=True)
+        assert pc.viz["nu"]["kde"].dims == ("chain", "team")
+
+    def test_rasterize_threshold(self, dataset):
+        pc = PlotMuseum.wrap(dataset, cols=["team"], rasterize_threshold=100)
+        pc.map(visuals.kde)
+        pc.map(visuals.point)
+        assert pc.viz["mu"]["kde"].values.flatten()[0].get_rasterized()
+        assert not pc.viz["mu"]["point"].values.flatten()[0].get_rasterized()
+        assert not pc.viz["plot"].values.flatten()[0].get_rasterized()
+
+    @pytest.mark.parametrize("backend", ["matplotlib", "bokeh"])
+    def test_density_2d(self, dataset, backend):
+        ds = xr.concat((dataset, dataset**2), dim="xy_dim")
+        pc = PlotMuseum.wrap(ds, cols=["team"], backend=backend)
+        pc.map(visuals.density_2d, gridsize=(8, 4))
+        assert pc.viz["mu"]["density_2d"].dims == ("team",)
+
+    def test_density_2d_preprocessed(self, dataset):
+        counts, extent = processing.density_2d(dataset["mu"], dataset["nu"], shared_extent=True)
+        pc = PlotMuseum.wrap(dataset[["mu"]], cols=["team"])
+        pc.preprocessed_data = xr.Dataset({"density_2d": counts, "extent": extent})
+        pc.map(visuals.density_2d, preprocessed=True)
+        image = pc.viz["mu"]["density_2d"].values[0]
+        assert image.get_array().shape == (128, 128)
+        np.testing.assert_allclose(image.get_extent(), extent.values[0])
+
+    def test_density_2d_raw(self, dataset):
+        ds = xr.concat((dataset, dataset**2), dim="xy_dim")
+        pc = PlotMuseum.wrap(ds[["mu"]], cols=["team"], backend="bokeh")
+        with pytest.raises(ValueError, match="density_2d"):
+            pc.map(visuals.density_2d, raw=True)
+        counts, extent = processing.density_2d(dataset["mu"], dataset["nu"], gridsize=(8, 4))
+        pc.preprocessed_data = xr.Dataset({"density_2d": counts, "extent": extent})
+        pc.map(visuals.density_2d, raw=True, preprocessed=True)
+        assert pc.viz["mu"]["density_2d"].dims == ("team",)
+
+    def test_limits_data(self, dataset):
+        pc = PlotMuseum.wrap(dataset[["mu"]], cols=["team"])
+        pc.map(visuals.point, limits={"x": "data"})
+        for team, ax in zip(dataset.team.values, pc.viz["plot"].values):
+            values = dataset["mu"].sel(team=team)
+            low, high = ax.get_xlim()
+            assert low < values.min() < values.max() < high
+            assert ax.get_autoscalex_on() is False
+
+    def test_limits_preprocessed_shared(self, dataset):
+        grid, pdf = processing.kde(dataset["mu"])
+        pc = PlotMuseum.wrap(dataset[["mu"]], cols=["team"], col_wrap=3)
+        pc.preprocessed_data = xr.Dataset({"grid": grid, "kde": pdf})
+        pc.map(
+            visuals.kde,
+            preprocessed=True,
+            limits={"x": "grid", "y": "kde"},
+            share_limits={"y": "all", "x": "col"},
+        )
+        axes = pc.viz["plot"].values
+        assert len({ax.get_ylim() for ax in axes}) == 1
+        assert axes[0].get_xlim() == axes[3].get_xlim()
+        assert axes[0].get_xlim() != axes[1].get_xlim()
+        assert axes[0].get_ylim()[1] > pdf.max()
+
+    def test_limits_bokeh_ranges(self, dataset):
+        pc = PlotMuseum.wrap(dataset[["mu"]], cols=["team"], col_wrap=3, backend="bokeh")
+        pc.map(
+            visuals.point, limits={"x": "data", "y": "data"}, share_limits={"x": "col", "y": "all"}
+        )
+        figures = pc.viz["plot"].values
+        assert all(isinstance(p.x_range, Range1d) for p in figures)
+        assert len({id(p.y_range) for p in figures}) == 1
+        assert figures[0].x_range is figures[3].x_range
+        assert figures[0].x_range is not figures[1].x_range
+        assert figures[0].y_range.end > dataset["mu"].max()
+
+    def test_pyplot_free(self, dataset):
+        n_figs = len(plt.get_fignums())
+
+        def render(team):
+            pc = PlotMuseum.wrap(
+                dataset.sel(team=[team]), cols=["team"], plot_grid_kws={"pyplot": False}
+            )
+            pc.map(visuals.kde)
+            buffer = io.BytesIO()
+            pc.viz["chart"].item().savefig(buffer, format="png")
+            return buffer.getvalue()
+
+        with ThreadPoolExecutor(max_workers=3) as executor:
+            images = list(executor.map(render, dataset.team.values))
+        assert all(image.startswith(b"\x89PNG") for image in images)
+        assert len(plt.get_fignums()) == n_figs
+
+    @pytest.mark.parametrize("pyplot", [True, False])
+    def test_plot_grid_ratios(self, dataset, pyplot):
+        pc = PlotMuseum.grid(
+            dataset,
+            cols=["team"],
+            rows=["__variable__"],
+            plot_grid_kws={
+                "pyplot": pyplot,
+                "width_ratios": [1, 1, 1, 1, 1, 3],
+                "height_ratios": [2, 1],
+            },
+        )
+        axes = pc.viz["mu"]["plot"].values
+        assert axes[-1].get_position().width > 2.5 * axes[0].get_position().width
+        assert pc.viz["nu"]["plot"].values[0].get_position().height < axes[0].get_position().height
+        pc.close()
+
+    def test_sorted_visuals(self, dataset):
+        sorted_draws = processing.sort_draws(dataset["mu"])
+        dots_x, dots_y = processing.quantile_dots(sorted_draws, nquantiles=20)
+        pc = PlotMuseum.wrap(dataset[["mu"]], cols=["team"])
+        pc.preprocessed_data = xr.Dataset(
+            {
+                "sorted_draws": sorted_draws,
+                "interval": processing.hdi(sorted_draws),
+                "dots_x": dots_x,
+                "dots_y": dots_y,
+            }
+        )
+        pc.map(visuals.ecdf, preprocessed=True)
+        pc.map(visuals.interval, preprocessed=True)
+        pc.map(visuals.quantile_dots, preprocessed=True)
+        line = pc.viz["mu"]["ecdf"].values[0]
+        assert line.get_ydata()[-1] == 1
+        assert len(pc.viz["mu"]["quantile_dots"].values[0].get_offsets()) == 20
+
+    def test_sorted_visuals_raw(self, dataset):
+        pc = PlotMuseum.wrap(dataset, cols=["team"], backend="bokeh")
+        pc.map(visuals.ecdf, raw=True)
+        pc.map(visuals.quantile_dots, raw=True, nquantiles=10)
+        assert pc.viz["nu"]["quantile_dots"].dims == ("team",)
+
+
+class TestPlotMuseumLifecycle:
+    def test_close(self, dataset):
+        n_figs = len(plt.get_fignums())
+        with PlotMuseum.wrap(dataset, cols=["team"]) as pc:
+            pc.map(visuals.kde)
+            assert len(plt.get_fignums()) == n_figs + 1
+        assert len(plt.get_fignums()) == n_figs
+        assert pc.viz["chart"].item() is None
+        assert (pc.viz["mu"]["kde"] == None).all()  # pylint: disable=singleton-comparison
+        assert pc.memory_usage()["artists"] == 0
+
+    def test_weak_store(self, dataset):
+        pc = PlotMuseum.wrap(dataset, cols=["team"], plot_grid_kws={"pyplot": False})
+        pc.map(visuals.kde, store_artist="weak")
+        artist_ref = pc.viz["mu"]["kde"].values[0]
+        assert artist_ref().axes is pc.viz["plot"].values[0]
+        report = pc.memory_usage()
+        assert report["charts"] == 1
+        assert report["targets"] == 6
+        assert report["artists"] == 12
+        assert report["data"] == dataset.nbytes
+        pc.viz["chart"].item().clear()
+        gc.collect()
+        assert artist_ref() is None
+        assert pc.memory_usage()["artists"] == 0
+
+    def test_pages(self, dataset):
+        pages = PlotMuseum.wrap(dataset, cols=["team"], max_plots_per_chart=4)
+        n_figs = len(plt.get_fignums())
+        teams = []
+        for page in pages:
+            page.map(visuals.kde)
+            assert len(plt.get_fignums()) == n_figs + 1
+            teams.extend(page.viz["plot"].team.values)
+        assert teams == list(dataset.team.values)
+        assert len(plt.get_fignums()) == n_figs
+
+    def test_pages_variable(self, dataset):
+        pages = PlotMuseum.wrap(dataset, cols=["__variable__", "team"], max_plots_per_chart=8)
+        n_plots = [
+            page.viz["mu"]["plot"].size if "mu" in page.viz.children else 0 for page in pages
+        ]
+        assert n_plots == [6, 0]
+
+    def test_pages_pool_context(self, dataset):
+        pool = FigurePool()
+        pages = PlotMuseum.wrap(dataset, cols=["team"], max_plots_per_chart=4, figure_pool=pool)
+        for page in pages:
+            with page:
+                page.map(visuals.kde)
+        assert not pool._in_use  # pylint: disable=protected-access
+        assert len(pool) == 2
+
+    def test_pages_split_inner_dims(self, dataset):
+        pages = PlotMuseum.wrap(dataset, cols=["chain", "team"], max_plots_per_chart=4)
+        facets = []
+        for page in pages:
+            plots = page.viz["plot"]
+            assert plots.size <= 4
+            facets.extend(
+                (chain, team) for chain in plots.chain.values for team in plots.team.values
+            )
+        assert facets == [
+            (chain, team) for chain in dataset.chain.values for team in dataset.team.values
+        ]
+
+    def test_pages_split_variable(self, dataset):
+        pages = PlotMuseum.wrap(dataset, cols=["__variable__", "team"], max_plots_per_chart=4)
+        n_plots = [
+            [page.viz[var_name]["plot"].size for var_name in page.viz.children] for page in pages
+        ]
+        assert n_plots == [[4], [2], [4], [2]]
+
+    def test_pages_invalid(self, dataset):
+        with pytest.raises(ValueError, match="max_plots_per_chart"):
+            PlotMuseum.wrap(dataset, cols=["team"], max_plots_per_chart=0)
+
+
+class TestPlotMuseumPrecision:
+    @pytest.mark.parametrize("visual", [visuals.kde, visuals.interval, visuals.ecdf])
+    def test_float32_below_pixel(self, dataset, visual):
+        lines = {}
+        for precision in (None, "float32"):
+            pc = PlotMuseum.wrap(
+                dataset,
+                cols=["team"],
+                precision=precision,
+                plot_grid_kws={"figsize": (12, 8), "dpi": 200, "pyplot": False},
+            )
+            pc.map(visual, limits={"x": "data"})
+            lines[precision] = pc.viz["mu"][visual.__name__].values
+        for line64, line32 in zip(lines[None], lines["float32"]):
+            ax = line64.axes
+            ax.set_ylim(line32.axes.get_ylim())
+            pixels64 = ax.transData.transform(line64.get_xydata())
+            pixels32 = ax.transData.transform(line32.get_xydata())
+            assert np.abs(pixels64 - pixels32).max() < 0.5
+
+    def test_float32_processing_and_backend(self, dataset):
+        pc = PlotMuseum.wrap(dataset, cols=["team"], backend="bokeh", precision="float32")
+        assert pc.data["mu"].dtype == np.float32
+        grid, pdf = processing.kde(pc.data["mu"], engine="batched")
+        assert grid.dtype == pdf.dtype == np.float32
+        pc.preprocessed_data = xr.Dataset({"grid": grid.astype(float), "kde": pdf})
+        pc.map(visuals.kde, preprocessed=True)
+        source = pc.viz["mu"]["kde"].values[0].data_source
+        assert source.data["x"].dtype == np.float32
+        assert source.data["y"].dtype == np.float32
+
+
+class TestPlotMuseumSharedSource:
+    @staticmethod
+    def view_rows(view):
+        shape = view.filter.args["shape"]
+        indices = [
+            np.arange(size) if idx is None else idx
+            for size, idx in zip(shape, view.filter.args["indices"])
+        ]
+        return np.arange(np.prod(shape)).reshape(shape)[np.ix_(*indices)].ravel()
+
+    def test_shared_source(self, dataset):
+        pc = PlotMuseum.grid(
+            dataset.expand_dims(view=2), cols=["view"], rows=["team"], backend="bokeh"
+        )
+        pc.map(visuals.scatter_draws, "trace", coords={"view": 0}, shared_source=["draw"])
+        pc.map(
+            visuals.scatter_draws, "chains", coords={"view": 1}, shared_source=["chain"], x="chain"
+        )
+        source = pc.shared_sources["mu"]
+        # the views are broadcasted, the values are stored only once
+        assert len(source.data["value"]) == dataset["mu"].size
+        assert set(source.data) == {"value", "draw", "chain"}
+        assert source.data["chain"].dtype == np.uint8
+        renderers = np.concatenate((pc.viz["mu"]["trace"].values, pc.viz["mu"]["chains"].values))
+        assert all(renderer.data_source is source for renderer in renderers)
+        for name in ("trace", "chains"):
+            rows = self.view_rows(pc.viz["mu"][name].sel(team="b").item().view)
+            np.testing.assert_array_equal(
+                np.asarray(source.data["value"])[rows],
+                dataset["mu"].sel(team="b").values.ravel(),
+            )
+
+    def test_shared_source_smaller_html(self):
+        dataset = xr.Dataset(
+            {"mu": (("chain", "draw", "team"), np.random.default_rng(3).normal(size=(4, 1000, 6)))}
+        )
+
+        def html_size(shared, linked):
+            data = dataset.expand_dims(view=2) if linked else dataset
+            rows = ["view"] if linked else []
+            pc = PlotMuseum.grid(data, cols=["team"], rows=rows, backend="bokeh")
+            for view in range(2 if linked else 1):
+                pc.map(
+                    visuals.scatter_draws,
+                    f"view{view}",
+                    coords={"view": view} if linked else None,
+                    shared_source=["draw"] if shared else False,
+                )
+            return len(file_html(pc.viz["chart"].item(), CDN))
+
+        assert html_size(shared=True, linked=False) < html_size(shared=False, linked=False)
+        assert html_size(shared=True, linked=True) < 0.75 * html_size(shared=False, linked=True)
+
+    def test_shared_source_missing_column(self, dataset):
+        pc = PlotMuseum.wrap(dataset, cols=["team"], backend="bokeh")
+        with pytest.raises(ValueError, match=r"shared_source=\['draw'\]"):
+            pc.map(visuals.scatter_draws, shared_source=True)
+
+    def test_scatter_draws_raw(self, dataset):
+        pc = PlotMuseum.wrap(dataset, cols=["team"], backend="bokeh")
+        with pytest.raises(ValueError, match="scatter_draws"):
+            pc.map(visuals.scatter_draws, raw=True)
+        pc.map(visuals.scatter_draws, raw=True, shared_source=["draw"])
+        assert pc.viz["mu"]["scatter_draws"].dims == ("team",)
+
+    def test_shared_source_load_other_backend(self, dataset, tmp_path):
+        pc = PlotMuseum.wrap(dataset, cols=["team"], backend="bokeh")
+        pc.map(visuals.scatter_draws, shared_source=["draw"])
+        pc.save(tmp_path / "museum.nc", engine="h5netcdf")
+        pc_loaded = PlotMuseum.load(tmp_path / "museum.nc", backend="matplotlib")
+        collection = pc_loaded.viz["mu"]["scatter_draws"].values[0]
+        assert len(collection.get_offsets()) == dataset["mu"].sel(team="a").size
+        pc_loaded.close()
+
+    def test_shared_source_needs_bokeh(self, dataset):
+        pc = PlotMuseum.wrap(dataset, cols=["team"])
+        with pytest.raises(ValueError, match="shared data sources"):
+            pc.map(visuals.scatter_draws, shared_source=True)
@@ -0,0 +1,98 @@
+# pylint: disable=no-self-use, redefined-outer-name
+import arviz as az
+import numpy as np
+import pytest
+from numpy.testing import assert_allclose
+
+from xarray_einstats import tutorial
+from xrtist.processing import density_2d, ecdf, eti, hdi, kde, quantile_dots, quantiles, sort_draws
+
+
+@pytest.fixture(scope="module")
+def dataarray():
+    return tutorial.generate_mcmc_like_dataset(3)["mu"]
+
+
+class TestKDE:
+    def test_batched_matches_arviz(self, dataarray):
+        grid, pdf = kde(dataarray, engine="batched", bw="silverman")
+        assert grid.dims == ("team", "kde_dim")
+        assert pdf.dims == ("team", "kde_dim")
+        for team in dataarray.team.values:
+            grid_ref, pdf_ref = az.kde(dataarray.sel(team=team).values.ravel(), bw="silverman")
+            assert_allclose(grid.sel(team=team), grid_ref)
+            assert_allclose(pdf.sel(team=team), pdf_ref, atol=0.02 * pdf_ref.max())
+
+    def test_shared_grid(self, dataarray):
+        grid, pdf = kde(dataarray, engine="batched", shared_grid=True)
+        assert (grid == grid.isel(team=0)).all()
+        integral = pdf.sum("kde_dim") * (grid.isel(kde_dim=1) - grid.isel(kde_dim=0))
+        assert_allclose(integral, 1, rtol=1e-2)
+
+    def test_shared_grid_needs_batched(self, dataarray):
+        with pytest.raises(ValueError, match="batched"):
+            kde(dataarray, shared_grid=True)
+
+
+class TestDensity2D:
+    def test_matches_histogram2d(self, dataarray):
+        da_y = dataarray**2
+        counts, extent = density_2d(dataarray, da_y, gridsize=(20, 10))
+        assert counts.dims == ("team", "y_bin", "x_bin")
+        assert counts.shape == (6, 10, 20)
+        assert (counts.sum(("x_bin", "y_bin")) == 40).all()
+        x_lims = extent.isel(team=0).values[:2]
+        y_lims = extent.isel(team=0).values[2:]
+        hist, _, _ = np.histogram2d(
+            da_y.isel(team=0).values.ravel(),
+            dataarray.isel(team=0).values.ravel(),
+            bins=(10, 20),
+            range=(y_lims, x_lims),
+        )
+        assert_allclose(counts.isel(team=0), hist)
+
+    def test_custom_extent(self, dataarray):
+        counts, extent = density_2d(dataarray, dataarray, extent=(0, 1, 0, 1))
+        assert (extent == [0, 1, 0, 1]).all()
+        assert (counts.sum(("x_bin", "y_bin")) < 40).any()
+
+
+class TestSortedStats:
+    def test_sort_draws(self, dataarray):
+        sorted_da = sort_draws(dataarray)
+        assert sorted_da.dims == ("team", "sorted_dim")
+        assert (sorted_da.diff("sorted_dim") >= 0).all()
+
+    @pytest.mark.parametrize("presorted", [True, False])
+    def test_intervals(self, dataarray, presorted):
+        da = sort_draws(dataarray) if presorted else dataarray
+        hdi_da = hdi(da, prob=0.8)
+        eti_da = eti(da, prob=0.8)
+        for team in dataarray.team.values:
+            values = dataarray.sel(team=team).values.ravel()
+            assert_allclose(hdi_da.sel(team=team), az.hdi(values, hdi_prob=0.8))
+            assert_allclose(eti_da.sel(team=team), np.quantile(values, (0.1, 0.9)))
+        assert list(hdi_da.hdi.values) == ["lower", "higher"]
+
+    def test_quantiles(self, dataarray):
+        probs = [0.1, 0.5, 0.75]
+        quants = quantiles(dataarray, probs)
+        assert_allclose(
+            quants.transpose("quantile", ...), dataarray.quantile(probs, ("chain", "draw"))
+        )
+
+    def test_ecdf(self, dataarray):
+        x, y = ecdf(dataarray)
+        assert x.dims == y.dims
+        assert_allclose(y.isel(sorted_dim=-1), 1)
+
+    def test_quantile_dots(self, dataarray):
+        x, y = quantile_dots(dataarray, nquantiles=20, binwidth=0.5)
+        assert x.dims == ("team", "dot_dim")
+        # dots are stacked from the bottom within each bin
+        assert (y.min("dot_dim") == 0.25).all()
+        for team in dataarray.team.values:
+            x_team, y_team = x.sel(team=team).values, y.sel(team=team).values
+            for x_bin in np.unique(x_team):
+                heights = np.sort(y_team[x_team == x_bin])
+                assert_allclose(heights, 0.25 + 0.5 * np.arange(len(heights)))